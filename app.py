@@ -1,27 +1,41 @@
 # app.py
 # Streamlit port of "StyleCode Data Lab v2.9" (index.html) - layout/flow preserved as much as possible.
 # Notes:
-# - Row-click behavior in HTML is approximated using radio/select widgets + table highlight.
-# - DATA is the same simulated structure concept as the HTML script section.
-# - KPI sales pulls from stylecode-api (HTML-wrapped JSON) with regex extraction like the original.
+# - Row-click behavior in HTML maps to native dataframe row selection (on_select), kept in session_state.
+#   Selector tables keep a fixed row order (DATA order), since the selection is remembered by row position.
+# - Panels read breakdowns from a SalesCube (cube.py): the warehouse GROUPING SETS result when configured,
+#   otherwise facts simulated from the HTML DATA structure (sample_data.py).
+# - Trend charts follow the Analysis Period (trend.py); every chart goes through a point budget (downsample.py).
+# - KPI sales pulls from stylecode-api through a stale-while-revalidate cache (kpi.py). The card is a
+#   placeholder filled at the end of the run, so API latency never delays the rest of the page; a lookup
+#   that outlives its budget is watched by a small fragment that reruns the page once when it lands.
 
 from __future__ import annotations
 
-import json
-import re
+import html
 import math
-import random
-from dataclasses import dataclass
-from datetime import date, datetime
-from typing import Dict, List, Tuple, Any, Optional
+from datetime import date
+from typing import Dict, List, Optional
 
 import pandas as pd
 import streamlit as st
 
-try:
-    import requests
-except Exception:
-    requests = None  # Streamlit Cloud may still have it; handle gracefully.
+from catalog import get_catalog
+from cube import SalesCube, current_cube, rebuild_cube, scope_gen, selection_gen
+from db import OFFLINE, SNAPSHOT_DIR
+from demographics import load_demographics
+from downsample import chart_frame
+from filters import SalesFilter
+from kpi import KpiValue, PendingKpi, cached_sales_amt, refresh_sales_amt, submit_many, submit_sales_amt
+from members import load_member_split
+from regions import load_region_index
+from sample_data import DATA
+from singleflight import get_flights
+from snapshot import read_through
+from stores import PAGE_SIZE, load_stores
+from trend import load_trend, trend_frame
+from warehouse import OFF_CHANNEL, ON_CHANNEL
+from warmup import get_warmup, month_range, read_brands
 
 
 # -----------------------------
@@ -37,6 +51,7 @@ html, body, [class*="css"]  { font-family: 'Pretendard', sans-serif; }
 .kpi-card { background: white; border: 1px solid #e2e8f0; border-radius: 16px; padding: 18px 18px; }
 .kpi-title { font-size: 11px; font-weight: 900; color: #94a3b8; letter-spacing: 0.12em; text-transform: uppercase; margin-bottom: 6px; }
 .kpi-value { font-size: 28px; font-weight: 900; color: #0f172a; }
+.kpi-note { font-size: 12px; color: #94a3b8; margin-top: 4px; }
 .card { background: white; border: 1px solid #e2e8f0; border-radius: 16px; padding: 18px 18px; }
 .card-strong { background: white; border: 2px solid #cbd5e1; border-radius: 16px; padding: 18px 18px; }
 .section-header { border-bottom: 4px solid #0f172a; padding-bottom: 10px; margin: 28px 0 18px 0; }
@@ -53,113 +68,16 @@ html, body, [class*="css"]  { font-family: 'Pretendard', sans-serif; }
 """
 st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
-# -----------------------------
-# Simulated DATA (ported conceptually from index.html)
-# -----------------------------
-# Minimal faithful translation of the JS DATA structure.
-DATA: Dict[str, Any] = {
-    "total": {
-        "전체": {
-            "qty": 6300,
-            "sales": 772_100_000,
-            "colors": {"BLACK": 3300, "WHITE": 1400, "GREY": 600, "BEIGE": 600, "NAVY": 400},
-            "sizes": {"230": 400, "240": 900, "250": 2000, "260": 2000, "270": 1000},
-        },
-        "온라인": {
-            "qty": 3500,
-            "sales": 452_100_000,
-            "colors": {"BLACK": 1500, "WHITE": 1000, "GREY": 600, "NAVY": 400},
-            "sizes": {"230": 400, "240": 900, "250": 1200, "260": 700, "270": 300},
-        },
-        "오프라인": {
-            "qty": 2800,
-            "sales": 320_000_000,
-            "colors": {"BLACK": 1800, "BEIGE": 600, "WHITE": 400},
-            "sizes": {"250": 800, "260": 1000, "270": 1000},
-        },
-    },
-    "on": {
-        "온라인 전체": {
-            "qty": 3500,
-            "colors": {"BLACK": 1500, "WHITE": 1000, "GREY": 600, "NAVY": 400},
-            "sizes": {"230": 400, "240": 900, "250": 1200, "260": 700, "270": 300},
-        },
-        "자사몰": {"qty": 1050, "colors": {"BLACK": 450, "WHITE": 350, "GREY": 150, "NAVY": 100}, "sizes": {"230": 100, "240": 300, "250": 350, "260": 200, "270": 100}},
-        "무신사": {"qty": 875, "colors": {"BLACK": 400, "WHITE": 200, "GREY": 175, "NAVY": 100}, "sizes": {"240": 275, "250": 300, "260": 200, "270": 100}},
-        "네이버 스토어": {"qty": 700, "colors": {"BLACK": 300, "WHITE": 250, "GREY": 100, "NAVY": 50}, "sizes": {"230": 150, "240": 250, "250": 200, "260": 100}},
-        "29CM": {"qty": 525, "colors": {"BLACK": 200, "WHITE": 150, "GREY": 100, "NAVY": 75}, "sizes": {"230": 100, "240": 200, "250": 150, "260": 75}},
-        "W컨셉": {"qty": 350, "colors": {"BLACK": 150, "WHITE": 50, "GREY": 75, "NAVY": 75}, "sizes": {"230": 50, "240": 100, "250": 150, "260": 50}},
-    },
-    "off": {
-        "오프라인 전체": {"qty": 2800, "colors": {"BLACK": 1800, "BEIGE": 600, "WHITE": 400}, "sizes": {"250": 800, "260": 1000, "270": 1000}, "geo": {"서울": 1200, "경기": 800, "부산": 300, "대구": 200, "광주": 100, "대전": 100, "제주": 100}},
-        "백화점": {"qty": 1960, "colors": {"BLACK": 1300, "BEIGE": 400, "WHITE": 260}, "sizes": {"250": 500, "260": 700, "270": 760}, "geo": {"서울": 1000, "경기": 500, "부산": 200, "대구": 100, "기타": 160}},
-        "대리점": {"qty": 560, "colors": {"BLACK": 300, "BEIGE": 160, "WHITE": 100}, "sizes": {"250": 200, "260": 200, "270": 160}, "geo": {"서울": 100, "경기": 200, "부산": 100, "대구": 100, "광주": 60}},
-        "직영점": {"qty": 280, "colors": {"BLACK": 200, "BEIGE": 40, "WHITE": 40}, "sizes": {"250": 100, "260": 100, "270": 80}, "geo": {"서울": 100, "경기": 100, "부산": 80}},
-    },
-    "cust": {
-        "회원 전체": {
-            "qty": 6300,
-            "sales": 772_100_000,
-            "colors": {"BLACK": 3000, "WHITE": 2000, "GREY": 1300},
-            "sizes": {"240": 1500, "250": 2500, "260": 2300},
-            "members": {"기존회원": {"qty": 4410, "sales": 540_470_000}, "신규회원": {"qty": 1890, "sales": 231_630_000}},
-            "ageGender": {
-                "male": {
-                    "15-19": {"qty": 180, "sales": 22_000_000}, "20-24": {"qty": 520, "sales": 64_000_000}, "25-29": {"qty": 850, "sales": 104_000_000},
-                    "30-34": {"qty": 920, "sales": 112_000_000}, "35-39": {"qty": 680, "sales": 83_000_000}, "40-44": {"qty": 450, "sales": 55_000_000},
-                    "45-49": {"qty": 320, "sales": 39_000_000}, "50-54": {"qty": 220, "sales": 27_000_000}, "55-59": {"qty": 150, "sales": 18_000_000}, "60~": {"qty": 120, "sales": 15_000_000},
-                },
-                "female": {
-                    "15-19": {"qty": 200, "sales": 24_000_000}, "20-24": {"qty": 680, "sales": 83_000_000}, "25-29": {"qty": 950, "sales": 116_000_000},
-                    "30-34": {"qty": 780, "sales": 95_000_000}, "35-39": {"qty": 520, "sales": 64_000_000}, "40-44": {"qty": 380, "sales": 46_000_000},
-                    "45-49": {"qty": 280, "sales": 34_000_000}, "50-54": {"qty": 200, "sales": 24_000_000}, "55-59": {"qty": 130, "sales": 16_000_000}, "60~": {"qty": 100, "sales": 12_000_000},
-                },
-            },
-        },
-        # HTML은 온라인/자사몰을 동일 데이터로 두었으므로 그대로 유지
-        "온라인": {
-            "qty": 3500, "sales": 452_100_000,
-            "colors": {"BLACK": 1500, "WHITE": 1200, "GREY": 800},
-            "sizes": {"240": 1000, "250": 1500, "260": 1000},
-            "members": {"기존회원": {"qty": 2450, "sales": 316_470_000}, "신규회원": {"qty": 1050, "sales": 135_630_000}},
-            "ageGender": {
-                "male": {"15-19": {"qty": 100, "sales": 12_000_000}, "20-24": {"qty": 290, "sales": 36_000_000}, "25-29": {"qty": 470, "sales": 58_000_000}, "30-34": {"qty": 510, "sales": 62_000_000},
-                         "35-39": {"qty": 380, "sales": 46_000_000}, "40-44": {"qty": 250, "sales": 30_000_000}, "45-49": {"qty": 180, "sales": 22_000_000}, "50-54": {"qty": 120, "sales": 15_000_000},
-                         "55-59": {"qty": 80, "sales": 10_000_000}, "60~": {"qty": 70, "sales": 8_000_000}},
-                "female": {"15-19": {"qty": 110, "sales": 13_000_000}, "20-24": {"qty": 380, "sales": 46_000_000}, "25-29": {"qty": 530, "sales": 65_000_000}, "30-34": {"qty": 430, "sales": 52_000_000},
-                           "35-39": {"qty": 290, "sales": 35_000_000}, "40-44": {"qty": 210, "sales": 25_000_000}, "45-49": {"qty": 150, "sales": 18_000_000}, "50-54": {"qty": 110, "sales": 13_000_000},
-                           "55-59": {"qty": 70, "sales": 8_000_000}, "60~": {"qty": 60, "sales": 7_000_000}},
-            },
-        },
-        "자사몰": None,  # will be set to 온라인 as alias
-        "오프라인": {
-            "qty": 2800, "sales": 320_000_000,
-            "colors": {"BLACK": 1500, "BEIGE": 800, "WHITE": 500},
-            "sizes": {"250": 1000, "260": 1300, "270": 500},
-            "members": {"기존회원": {"qty": 1960, "sales": 224_000_000}, "신규회원": {"qty": 840, "sales": 96_000_000}},
-            "ageGender": {
-                "male": {"15-19": {"qty": 80, "sales": 10_000_000}, "20-24": {"qty": 230, "sales": 28_000_000}, "25-29": {"qty": 380, "sales": 46_000_000}, "30-34": {"qty": 410, "sales": 50_000_000},
-                         "35-39": {"qty": 300, "sales": 37_000_000}, "40-44": {"qty": 200, "sales": 25_000_000}, "45-49": {"qty": 140, "sales": 17_000_000}, "50-54": {"qty": 100, "sales": 12_000_000},
-                         "55-59": {"qty": 70, "sales": 8_000_000}, "60~": {"qty": 50, "sales": 6_000_000}},
-                "female": {"15-19": {"qty": 90, "sales": 11_000_000}, "20-24": {"qty": 300, "sales": 37_000_000}, "25-29": {"qty": 420, "sales": 51_000_000}, "30-34": {"qty": 350, "sales": 43_000_000},
-                           "35-39": {"qty": 230, "sales": 29_000_000}, "40-44": {"qty": 170, "sales": 21_000_000}, "45-49": {"qty": 130, "sales": 16_000_000}, "50-54": {"qty": 90, "sales": 11_000_000},
-                           "55-59": {"qty": 60, "sales": 8_000_000}, "60~": {"qty": 40, "sales": 5_000_000}},
-            },
-        },
-        "백화점": None,  # optional: you can expand similarly if needed
-        "대리점": None,
-        "직영점": None,
-    },
-}
-DATA["cust"]["자사몰"] = DATA["cust"]["온라인"]
-
-
 # -----------------------------
 # Helpers
 # -----------------------------
-API_URL = "https://stylecode-api-dpqrqczbz89gpmn2hnxx34.streamlit.app/"
-
-AGE_LABELS = ["15-19", "20-24", "25-29", "30-34", "35-39", "40-44", "45-49", "50-54", "55-59", "60~"]
+# Tables carry raw int64/float64 values; won/thousands formatting is applied client-side per column.
+NUMBER_COLUMNS = {
+    "매출액": st.column_config.NumberColumn(format="%,d원"),
+    "수량": st.column_config.NumberColumn(format="%,d"),
+    "판매수량": st.column_config.NumberColumn(format="%,d"),
+    "비중(%)": st.column_config.NumberColumn(format="%.1f"),
+}
 
 
 def _fmt_won(x: Optional[float]) -> str:
@@ -177,23 +95,44 @@ def _ratio(v: float, total: float) -> float:
     return (v / total) * 100.0
 
 
-def _table_from_dict(obj: Dict[str, float], total: float, colname_key: str) -> pd.DataFrame:
-    rows = []
-    for k, v in obj.items():
-        rows.append({colname_key: k, "판매수량": int(v), "비중(%)": round(_ratio(float(v), float(total)), 1)})
-    df = pd.DataFrame(rows)
-    if not df.empty:
-        df = df.sort_values(by="판매수량", ascending=False).reset_index(drop=True)
-    return df
+def _scope(label: str) -> Dict[str, str]:
+    """Channel-tree label -> cube filter ('전체'/'회원 전체' = all, '온라인 전체' = channel, '자사몰' = sub-channel)."""
+    name = label.replace(" 전체", "").strip()
+    if name in ("전체", "회원"):
+        return {}
+    if name in (ON_CHANNEL, OFF_CHANNEL):
+        return {"channel": name}
+    return {"sub_channel": name}
 
 
-def _highlight_selected(df: pd.DataFrame, key_col: str, selected_value: str) -> pd.io.formats.style.Styler:
-    def _hl(row):
-        if str(row[key_col]) == str(selected_value):
-            return ["background-color: #f1f5f9; font-weight: 800"] * len(row)
-        return [""] * len(row)
+def _channel_targets(cube: SalesCube, section: str) -> List[str]:
+    """
+    Rows of a channel selector table in a fixed order: the "전체" row, the sub-channels in DATA order, then
+    any others the cube has, by name. Row selection is kept by position, so sales must not reorder the rows.
+    """
+    labels = list(DATA[section])
+    channel = ON_CHANNEL if section == "on" else OFF_CHANNEL
+    extra = sorted(set(cube.members("sub_channel", channel=channel)) - set(labels))
+    return labels + extra
 
-    return df.style.apply(_hl, axis=1)
+
+def _selectable_table(df: pd.DataFrame, options: List[str], state_key: str, height: int) -> str:
+    """
+    Render a channel table with single-row selection; options[i] is the value row i stands for.
+    Clearing the selection falls back to options[0] (the "전체" row).
+    """
+    event = st.dataframe(
+        df,
+        use_container_width=True,
+        height=height,
+        column_config=NUMBER_COLUMNS,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"{state_key}_table",
+    )
+    rows = event.selection.rows
+    st.session_state[state_key] = options[rows[0]] if rows and rows[0] < len(options) else options[0]
+    return st.session_state[state_key]
 
 
 def _month_yyyy_mm(d: date) -> str:
@@ -202,129 +141,79 @@ def _month_yyyy_mm(d: date) -> str:
 
 @st.cache_data(ttl=600)
 def load_brands_local() -> List[str]:
-    # HTML loads ./data/brands.json; try same path in Streamlit.
-    # Fallback to common brand list if file not present.
-    try:
-        with open("data/brands.json", "r", encoding="utf-8") as f:
-            j = json.load(f)
-        brands = j.get("brands")
-        if isinstance(brands, list) and brands:
-            return [str(x) for x in brands]
-    except Exception:
-        pass
-    return ["I", "M", "ST", "V", "X"]
+    return read_brands()
+
+
+def render_kpi(slot, kpi: KpiValue) -> None:
+    """One markdown element, so refilling the placeholder at the end of the run never leaves a stale line."""
+    note = ""
+    if kpi.error:
+        note = f"데이터 로드 실패: {kpi.error}"
+    elif kpi.pending:
+        note = "불러오는 중…"
+    elif kpi.generated_at:
+        note = f"기준 시각: {kpi.generated_at}" + (" (갱신 중)" if kpi.stale else "")
+    slot.markdown(
+        f'<div class="kpi-value">{_fmt_won(kpi.sales_amt)}</div><div class="kpi-note">{html.escape(note)}</div>',
+        unsafe_allow_html=True,
+    )
 
 
-@st.cache_data(ttl=300)
-def fetch_sales_amt(brand: str, month: str) -> Tuple[Optional[int], Optional[str]]:
+@st.fragment(run_every=1.0)
+def poll_kpi(pending: PendingKpi) -> None:
     """
-    Mimic the HTML behavior:
-    - call API_URL?brand=...&month=...
-    - response might be HTML; extract JSON by regex containing sales_amt
-    - return (sales_amt, error_message)
+    Wait for a KPI lookup that outlived its budget, then rerun the page once; that rerun finds the value cached
+    (or the error held by kpi.InFlight), so it renders without polling and the timer is gone.
     """
-    if not brand:
-        return None, "brand is empty"
+    if pending.done():
+        st.rerun()
 
-    if requests is None:
-        return None, "requests not available"
 
-    try:
-        url = f"{API_URL}?brand={brand}&month={month}"
-        r = requests.get(url, timeout=10)
-        if r.status_code != 200:
-            return None, f"HTTP {r.status_code}"
-
-        text = r.text
-
-        # Try multiple patterns like the HTML logic.
-        patterns = [
-            r'(\{[\s\S]*"sales_amt"[\s\S]*"generated_at"[\s\S]*?\})',
-            r'(\{[\s\S]*"sales_amt"[\s\S]*?\})',
-            r'(\{[\s\S]*?\})',
-        ]
-        data = None
-        for p in patterns:
-            m = re.search(p, text)
-            if m:
-                try:
-                    data = json.loads(m.group(1))
-                    break
-                except Exception:
-                    data = None
-
-        if not isinstance(data, dict) or "sales_amt" not in data:
-            return None, "JSON parse failed / sales_amt missing"
-
-        sales_amt = data.get("sales_amt")
-        if isinstance(sales_amt, (int, float)):
-            return int(sales_amt), None
-        return None, "sales_amt is not numeric"
-
-    except Exception as e:
-        return None, str(e)
-
-
-def make_trend_series(seed_key: str, metric: str, view: str, mode: str, selected: str) -> pd.DataFrame:
+def render_trend_chart(prefix: str, title: str, mode: str, selected: str, selection: SalesFilter) -> None:
     """
-    Create trend lines similar to index.html renderSingleChart().
-    - view: daily/weekly/monthly
-    - metric: sales/qty
-    - mode: main/on/off
-    - selected: selectedChannel
-    Returns long-form DF: [x, series, value]
+    Trend card shared by TOTAL/ONLINE/OFFLINE: 매출/수량 and 일/주/월 toggles + line chart.
+    - prefix: session_state namespace ("main", "on", "off" -> main_metric, main_view, ...)
     """
-    rnd = random.Random(seed_key)
-
-    if view == "daily":
-        labels = ["01-12", "01-13", "01-14", "01-15", "01-16"]
-        multiplier = 1.0
-    elif view == "weekly":
-        labels = ["Jan W1", "Jan W2", "Jan W3", "Jan W4"]
-        multiplier = 5.5
-    else:
-        labels = ["Oct", "Nov", "Dec", "Jan"]
-        multiplier = 22.0
-
-    def _scale(v: float, base: float) -> float:
-        if metric == "sales":
-            return v * base * multiplier
-        return v * multiplier
-
-    rows = []
-
-    if mode == "main":
-        channel = selected or "전체"
-        if channel == "전체":
-            series_defs = [
-                ("ONLINE TOTAL", [320, 450, 380, 520, 480], 60000),
-                ("OFFLINE TOTAL", [280, 310, 290, 410, 390], 70000),
-            ]
-        elif channel == "온라인":
-            series_defs = [("ONLINE TOTAL", [320, 450, 380, 520, 480], 60000)]
-        else:
-            series_defs = [("OFFLINE TOTAL", [280, 310, 290, 410, 390], 70000)]
-
-        for name, vals, base in series_defs:
-            for x, v in zip(labels, vals[: len(labels)]):
-                rows.append({"x": x, "series": name, "value": _scale(float(v), float(base))})
+    metric_key, view_key = f"{prefix}_metric", f"{prefix}_view"
+    if metric_key not in st.session_state:
+        st.session_state[metric_key] = "sales"
+    if view_key not in st.session_state:
+        st.session_state[view_key] = "daily"
 
-    else:
-        is_on = mode == "on"
-        if "전체" in (selected or ""):
-            targets = ["자사몰", "무신사", "네이버"] if is_on else ["백화점", "대리점", "직영점"]
-        else:
-            targets = [selected] if selected else (["온라인 전체"] if is_on else ["오프라인 전체"])
-
-        base_vals = [100, 150, 130, 180, 160]
-        base = 55000
-        for name in targets:
-            for x, v in zip(labels, base_vals[: len(labels)]):
-                jitter = 0.8 + rnd.random() * 0.4
-                rows.append({"x": x, "series": name, "value": _scale(float(v) * jitter, float(base))})
-
-    df = pd.DataFrame(rows)
-    return df
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    cA, cB = st.columns([1.4, 2.6])
+    with cA:
+        st.markdown(f'<div class="small-label">{title}</div>', unsafe_allow_html=True)
+    with cB:
+        cc1, cc2 = st.columns([1, 1])
+        with cc1:
+            st.session_state[metric_key] = st.radio(
+                metric_key,
+                options=["sales", "qty"],
+                horizontal=True,
+                index=["sales", "qty"].index(st.session_state[metric_key]),
+                format_func=lambda x: "매출" if x == "sales" else "수량",
+                label_visibility="collapsed",
+                key=f"{metric_key}_radio",
+            )
+        with cc2:
+            st.session_state[view_key] = st.radio(
+                view_key,
+                options=["daily", "weekly", "monthly"],
+                horizontal=True,
+                index=["daily", "weekly", "monthly"].index(st.session_state[view_key]),
+                format_func=lambda x: {"daily": "일", "weekly": "주", "monthly": "월"}[x],
+                label_visibility="collapsed",
+                key=f"{view_key}_radio",
+            )
+
+    trend, trend_err = load_trend(selection, st.session_state[view_key], scope_gen(selection))
+    if trend_err:
+        st.caption(f"추이 데이터 로드 실패: {trend_err}")
+    # Streamlit native line chart (quick + stable); the frame is already wide and x-indexed.
+    # Long periods are cut to CHART_POINTS per series (LTTB) before they are sent to the browser.
+    st.line_chart(chart_frame(trend_frame(trend, st.session_state[metric_key], mode, selected)), height=280)
+    st.markdown("</div>", unsafe_allow_html=True)
 
 
 # -----------------------------
@@ -348,26 +237,24 @@ st.write("")
 # Controls (Brand / Category / StyleCode / Period) + KPI
 # -----------------------------
 brands = load_brands_local()
+
+# Page default filters; the process-wide warm-up prefetches every brand with these (see warmup.py).
+DEFAULT_CATEGORIES = ("shoes",)
+DEFAULT_STYLECODES = ("SC-001",)
+warmup = get_warmup(DEFAULT_CATEGORIES, DEFAULT_STYLECODES)
 default_brand = "X" if "X" in brands else brands[0]
 
 if "brand" not in st.session_state:
     st.session_state.brand = default_brand
 
 if "categories" not in st.session_state:
-    st.session_state.categories = ["shoes"]
+    st.session_state.categories = list(DEFAULT_CATEGORIES)
 
 if "stylecodes" not in st.session_state:
-    st.session_state.stylecodes = ["SC-001"]
+    st.session_state.stylecodes = list(DEFAULT_STYLECODES)
 
 today = date.today()
-first_day = date(today.year, today.month, 1)
-last_day = date(today.year, today.month, 28)
-# safe last day of month:
-try:
-    import calendar
-    last_day = date(today.year, today.month, calendar.monthrange(today.year, today.month)[1])
-except Exception:
-    pass
+first_day, last_day = month_range(today)
 
 if "period" not in st.session_state:
     st.session_state.period = (first_day, last_day)
@@ -380,10 +267,9 @@ with kpi_col:
     st.markdown('<div class="kpi-title">Total Sales Amount</div>', unsafe_allow_html=True)
 
     month = _month_yyyy_mm(st.session_state.period[0])
-    sales_amt, sales_err = fetch_sales_amt(st.session_state.brand, month)
-    st.markdown(f'<div class="kpi-value">{_fmt_won(sales_amt)}</div>', unsafe_allow_html=True)
-    if sales_err:
-        st.caption(f"데이터 로드 실패: {sales_err}")
+    kpi_pending = submit_sales_amt(st.session_state.brand, month)
+    kpi_slot = st.empty()
+    render_kpi(kpi_slot, cached_sales_amt(st.session_state.brand, month) or KpiValue(None, pending=True))
     st.markdown("</div>", unsafe_allow_html=True)
 
 st.write("")
@@ -396,6 +282,12 @@ with st.container():
         st.markdown('<div class="small-label">Brand Selection</div>', unsafe_allow_html=True)
         st.session_state.brand = st.selectbox("", brands, index=brands.index(st.session_state.brand) if st.session_state.brand in brands else 0, key="brand_select")
 
+        # Per-brand KPIs come from the cache; one parallel wave fills it for the next rerun.
+        # (Shown as a caption: changing option labels between reruns would break the widget's value.)
+        submit_many([(b, month) for b in brands])
+        brand_kpis = [(b, cached_sales_amt(b, month)) for b in brands]
+        st.caption(" · ".join(f"{b} {_fmt_won(v.sales_amt if v else None)}" for b, v in brand_kpis))
+
     with c2:
         st.markdown('<div class="small-label">Category</div>', unsafe_allow_html=True)
         st.session_state.categories = st.multiselect(
@@ -408,11 +300,15 @@ with st.container():
 
     with c3:
         st.markdown('<div class="small-label">Style Code</div>', unsafe_allow_html=True)
+        # Only the top catalog matches for the search text (plus what is already picked) become options.
+        catalog, _ = get_catalog(st.session_state.brand)
+        style_query = st.text_input("style_query", placeholder="스타일 코드/이름 검색", label_visibility="collapsed", key="style_query")
+        matches = catalog.search(style_query, st.session_state.categories)
         st.session_state.stylecodes = st.multiselect(
             "",
-            options=["SC-001", "SC-002", "SC-003", "SC-004", "SC-005"],
+            options=list(dict.fromkeys(list(st.session_state.stylecodes) + matches)),
             default=st.session_state.stylecodes,
-            format_func=lambda x: {"SC-001": "SC-AIR-01", "SC-002": "SC-RUN-05", "SC-003": "SC-CT-09", "SC-004": "SC-LIFESTYLE-X", "SC-005": "SC-PRO-CHAMP"}.get(x, x),
+            format_func=catalog.label,
             key="style_ms",
         )
 
@@ -428,11 +324,28 @@ with st.container():
 
     st.markdown("</div>", unsafe_allow_html=True)
 
-# In this simulated version, "조회하기" mainly triggers rerun.
+# Cache scope of the current selection: KPI per (brand, month), every panel per SalesFilter.
+kpi_args = (st.session_state.brand, _month_yyyy_mm(st.session_state.period[0]))
+selection = SalesFilter.of(
+    st.session_state.brand,
+    st.session_state.period[0],
+    st.session_state.period[1],
+    st.session_state.categories,
+    st.session_state.stylecodes,
+)
+
+# "조회하기" refreshes only this selection: build the next generation here, then publish it.
+# Other sessions keep reading the current generation (and the previous KPI value) until the new one is ready.
 if run:
-    st.cache_data.clear()
+    refresh_sales_amt(*kpi_args)
+    rebuild_cube(selection)
     st.rerun()
 
+# Cube for the current selection (one pooled warehouse round trip, or simulated facts), shared across sessions.
+cube, data_err = current_cube(selection)
+if data_err:
+    st.caption(f"웨어하우스 로드 실패 (시뮬레이션 데이터 표시): {data_err}")
+
 
 # -----------------------------
 # GROUP 1: ON/OFF PERFORMANCE
@@ -448,346 +361,221 @@ st.markdown(
 )
 
 # ---- TOTAL Performance Detailed
-st.markdown('<div class="block-title">TOTAL Performance Detailed</div>', unsafe_allow_html=True)
-
-# Left summary table (전체/온라인/오프라인)
-total_summary = pd.DataFrame(
-    [
-        {"채널 구분": "전체", "매출액": DATA["total"]["전체"]["sales"], "수량": DATA["total"]["전체"]["qty"], "비중(%)": 100.0},
-        {"채널 구분": "온라인", "매출액": DATA["total"]["온라인"]["sales"], "수량": DATA["total"]["온라인"]["qty"], "비중(%)": round(_ratio(DATA["total"]["온라인"]["sales"], DATA["total"]["전체"]["sales"]), 1)},
-        {"채널 구분": "오프라인", "매출액": DATA["total"]["오프라인"]["sales"], "수량": DATA["total"]["오프라인"]["qty"], "비중(%)": round(_ratio(DATA["total"]["오프라인"]["sales"], DATA["total"]["전체"]["sales"]), 1)},
-    ]
-)
-
-if "total_selected" not in st.session_state:
-    st.session_state.total_selected = "전체"
-
-tcol1, tcol2, tcol3 = st.columns([1.1, 1.1, 1.1], gap="large")
-
-with tcol1:
-    st.markdown('<div class="card-strong">', unsafe_allow_html=True)
-    st.markdown('<div class="block-title">전체 실적</div>', unsafe_allow_html=True)
-    st.session_state.total_selected = st.radio(
-        "선택",
-        options=["전체", "온라인", "오프라인"],
-        index=["전체", "온라인", "오프라인"].index(st.session_state.total_selected),
-        horizontal=True,
-        label_visibility="collapsed",
-        key="total_radio",
+@st.fragment
+def render_total_section(cube: SalesCube, selection: SalesFilter) -> None:
+    """전체/온라인/오프라인 table, color/size and TOTAL trend; its toggles rerun only this fragment."""
+    st.markdown('<div class="block-title">TOTAL Performance Detailed</div>', unsafe_allow_html=True)
+
+    # Left summary table (전체/온라인/오프라인)
+    all_qty, all_sales = cube.total()
+    on_qty, on_sales = cube.total(channel=ON_CHANNEL)
+    off_qty, off_sales = cube.total(channel=OFF_CHANNEL)
+    total_summary = pd.DataFrame(
+        [
+            {"채널 구분": "전체", "매출액": all_sales, "수량": all_qty, "비중(%)": 100.0},
+            {"채널 구분": "온라인", "매출액": on_sales, "수량": on_qty, "비중(%)": round(_ratio(on_sales, all_sales), 1)},
+            {"채널 구분": "오프라인", "매출액": off_sales, "수량": off_qty, "비중(%)": round(_ratio(off_sales, all_sales), 1)},
+        ]
     )
 
-    df_show = total_summary.copy()
-    df_show["매출액"] = df_show["매출액"].map(lambda x: f"{x:,}")
-    df_show["수량"] = df_show["수량"].map(lambda x: f"{x:,}")
-    sty = _highlight_selected(df_show, "채널 구분", st.session_state.total_selected)
-    st.dataframe(sty, use_container_width=True, height=330)
-    st.markdown("</div>", unsafe_allow_html=True)
+    if "total_selected" not in st.session_state:
+        st.session_state.total_selected = "전체"
 
-# Total color/size by selection
-sel_total = st.session_state.total_selected
-total_d = DATA["total"].get(sel_total, DATA["total"]["전체"])
+    tcol1, tcol2, tcol3 = st.columns([1.1, 1.1, 1.1], gap="large")
 
-with tcol2:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown(f'<div class="block-title">컬러별 판매 현황 <span class="badge badge-slate">{sel_total}</span></div>', unsafe_allow_html=True)
-    df = _table_from_dict(total_d["colors"], total_d["qty"], "컬러")
-    st.dataframe(df, use_container_width=True, height=330)
-    st.markdown("</div>", unsafe_allow_html=True)
+    with tcol1:
+        st.markdown('<div class="card-strong">', unsafe_allow_html=True)
+        st.markdown('<div class="block-title">전체 실적</div>', unsafe_allow_html=True)
+        _selectable_table(total_summary, ["전체", "온라인", "오프라인"], "total_selected", height=330)
+        st.markdown("</div>", unsafe_allow_html=True)
 
-with tcol3:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown(f'<div class="block-title">사이즈별 판매 현황 <span class="badge badge-slate">{sel_total}</span></div>', unsafe_allow_html=True)
-    df = _table_from_dict(total_d["sizes"], total_d["qty"], "사이즈")
-    st.dataframe(df, use_container_width=True, height=330)
-    st.markdown("</div>", unsafe_allow_html=True)
+    # Total color/size by selection
+    sel_total = st.session_state.total_selected
+    total_tables = cube.tables(("color", "size"), **_scope(sel_total))
 
-st.write("")
+    with tcol2:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown(f'<div class="block-title">컬러별 판매 현황 <span class="badge badge-slate">{sel_total}</span></div>', unsafe_allow_html=True)
+        df = total_tables["color"]
+        st.dataframe(df, use_container_width=True, height=330, column_config=NUMBER_COLUMNS)
+        st.markdown("</div>", unsafe_allow_html=True)
 
-# Total trend chart
-if "main_metric" not in st.session_state:
-    st.session_state.main_metric = "sales"
-if "main_view" not in st.session_state:
-    st.session_state.main_view = "daily"
-
-st.markdown('<div class="card">', unsafe_allow_html=True)
-cA, cB = st.columns([1.4, 2.6])
-with cA:
-    st.markdown(f'<div class="small-label">TOTAL TREND: {sel_total}</div>', unsafe_allow_html=True)
-with cB:
-    cc1, cc2 = st.columns([1, 1])
-    with cc1:
-        st.session_state.main_metric = st.radio(
-            "metric",
-            options=["sales", "qty"],
-            horizontal=True,
-            index=["sales", "qty"].index(st.session_state.main_metric),
-            format_func=lambda x: "매출" if x == "sales" else "수량",
-            label_visibility="collapsed",
-            key="main_metric_radio",
-        )
-    with cc2:
-        st.session_state.main_view = st.radio(
-            "view",
-            options=["daily", "weekly", "monthly"],
-            horizontal=True,
-            index=["daily", "weekly", "monthly"].index(st.session_state.main_view),
-            format_func=lambda x: {"daily": "일", "weekly": "주", "monthly": "월"}[x],
-            label_visibility="collapsed",
-            key="main_view_radio",
-        )
-
-trend_df = make_trend_series(
-    seed_key=f"main|{st.session_state.brand}|{sel_total}|{st.session_state.main_metric}|{st.session_state.main_view}",
-    metric=st.session_state.main_metric,
-    view=st.session_state.main_view,
-    mode="main",
-    selected=sel_total,
-)
-
-# Streamlit native line chart (quick + stable)
-pivot = trend_df.pivot_table(index="x", columns="series", values="value", aggfunc="sum").reset_index()
-pivot = pivot.set_index("x")
-st.line_chart(pivot, height=280)
-
-st.markdown("</div>", unsafe_allow_html=True)
-
-st.write("")
-st.markdown('<div class="hr-gap"></div>', unsafe_allow_html=True)
-
-# ---- Online Performance Detailed
-st.markdown('<div class="block-title">Online Performance Detailed</div>', unsafe_allow_html=True)
-
-if "on_selected" not in st.session_state:
-    st.session_state.on_selected = "온라인 전체"
-if "on_metric" not in st.session_state:
-    st.session_state.on_metric = "sales"
-if "on_view" not in st.session_state:
-    st.session_state.on_view = "daily"
-
-on_targets = list(DATA["on"].keys())
-ocol1, ocol2, ocol3 = st.columns([1.1, 1.1, 1.1], gap="large")
-
-with ocol1:
-    st.markdown('<div class="card-strong">', unsafe_allow_html=True)
-    st.markdown('<div class="block-title">온라인 채널별 실적</div>', unsafe_allow_html=True)
-
-    st.session_state.on_selected = st.radio(
-        "온라인 선택",
-        options=on_targets,
-        index=on_targets.index(st.session_state.on_selected) if st.session_state.on_selected in on_targets else 0,
-        label_visibility="collapsed",
-        key="on_radio",
-    )
+    with tcol3:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown(f'<div class="block-title">사이즈별 판매 현황 <span class="badge badge-slate">{sel_total}</span></div>', unsafe_allow_html=True)
+        df = total_tables["size"]
+        st.dataframe(df, use_container_width=True, height=330, column_config=NUMBER_COLUMNS)
+        st.markdown("</div>", unsafe_allow_html=True)
 
-    # Build summary table like HTML list (with fake sales ratios for sub-channels)
-    # The HTML's online list includes sales numbers. Here we approximate by allocating from total online sales.
-    online_total_sales = DATA["total"]["온라인"]["sales"]
-    alloc = {
-        "온라인 전체": online_total_sales,
-        "자사몰": int(online_total_sales * 0.30),
-        "무신사": int(online_total_sales * 0.25),
-        "네이버 스토어": int(online_total_sales * 0.20),
-        "29CM": int(online_total_sales * 0.15),
-        "W컨셉": int(online_total_sales * 0.10),
-    }
-    rows = []
-    for k in on_targets:
-        qty = DATA["on"][k]["qty"]
-        sales = alloc.get(k, int(online_total_sales * 0.05))
-        ratio = round(_ratio(sales, online_total_sales), 1) if k != "온라인 전체" else 100.0
-        rows.append({"채널명": k, "매출액": f"{sales:,}", "수량": f"{qty:,}", "비중(%)": ratio})
-    df_on_sum = pd.DataFrame(rows)
-    st.dataframe(_highlight_selected(df_on_sum, "채널명", st.session_state.on_selected), use_container_width=True, height=330)
-    st.markdown("</div>", unsafe_allow_html=True)
+    st.write("")
 
-on_d = DATA["on"].get(st.session_state.on_selected, DATA["on"]["온라인 전체"])
+    # Total trend chart
+    render_trend_chart("main", f"TOTAL TREND: {sel_total}", "main", sel_total, selection)
 
-with ocol2:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown(f'<div class="block-title">컬러별 판매 현황 <span class="badge badge-blue">{st.session_state.on_selected}</span></div>', unsafe_allow_html=True)
-    df = _table_from_dict(on_d["colors"], on_d["qty"], "컬러")
-    st.dataframe(df, use_container_width=True, height=330)
-    st.markdown("</div>", unsafe_allow_html=True)
+    st.write("")
+    st.markdown('<div class="hr-gap"></div>', unsafe_allow_html=True)
 
-with ocol3:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown(f'<div class="block-title">사이즈별 판매 현황 <span class="badge badge-blue">{st.session_state.on_selected}</span></div>', unsafe_allow_html=True)
-    df = _table_from_dict(on_d["sizes"], on_d["qty"], "사이즈")
-    st.dataframe(df, use_container_width=True, height=330)
-    st.markdown("</div>", unsafe_allow_html=True)
 
-st.write("")
+render_total_section(cube, selection)
 
-st.markdown('<div class="card">', unsafe_allow_html=True)
-cA, cB = st.columns([1.4, 2.6])
-with cA:
-    st.markdown(f'<div class="small-label">ONLINE TREND: {st.session_state.on_selected}</div>', unsafe_allow_html=True)
-with cB:
-    cc1, cc2 = st.columns([1, 1])
-    with cc1:
-        st.session_state.on_metric = st.radio(
-            "on_metric",
-            options=["sales", "qty"],
-            horizontal=True,
-            index=["sales", "qty"].index(st.session_state.on_metric),
-            format_func=lambda x: "매출" if x == "sales" else "수량",
-            label_visibility="collapsed",
-            key="on_metric_radio",
-        )
-    with cc2:
-        st.session_state.on_view = st.radio(
-            "on_view",
-            options=["daily", "weekly", "monthly"],
-            horizontal=True,
-            index=["daily", "weekly", "monthly"].index(st.session_state.on_view),
-            format_func=lambda x: {"daily": "일", "weekly": "주", "monthly": "월"}[x],
-            label_visibility="collapsed",
-            key="on_view_radio",
-        )
+# ---- Online Performance Detailed
+@st.fragment
+def render_online_section(cube: SalesCube, selection: SalesFilter) -> None:
+    """Online channel table, color/size and ONLINE trend."""
+    st.markdown('<div class="block-title">Online Performance Detailed</div>', unsafe_allow_html=True)
 
-trend_df = make_trend_series(
-    seed_key=f"on|{st.session_state.brand}|{st.session_state.on_selected}|{st.session_state.on_metric}|{st.session_state.on_view}",
-    metric=st.session_state.on_metric,
-    view=st.session_state.on_view,
-    mode="on",
-    selected=st.session_state.on_selected,
-)
-pivot = trend_df.pivot_table(index="x", columns="series", values="value", aggfunc="sum").reset_index().set_index("x")
-st.line_chart(pivot, height=280)
-st.markdown("</div>", unsafe_allow_html=True)
+    if "on_selected" not in st.session_state:
+        st.session_state.on_selected = "온라인 전체"
 
-st.write("")
-st.markdown('<div class="hr-gap"></div>', unsafe_allow_html=True)
+    _, on_sales = cube.total(channel=ON_CHANNEL)
+    on_targets = _channel_targets(cube, "on")
+    ocol1, ocol2, ocol3 = st.columns([1.1, 1.1, 1.1], gap="large")
 
-# ---- Offline Performance Detailed
-st.markdown('<div class="block-title">Offline Performance Detailed</div>', unsafe_allow_html=True)
-
-if "off_selected" not in st.session_state:
-    st.session_state.off_selected = "오프라인 전체"
-if "off_metric" not in st.session_state:
-    st.session_state.off_metric = "sales"
-if "off_view" not in st.session_state:
-    st.session_state.off_view = "daily"
-
-off_targets = list(DATA["off"].keys())
-fcol1, fcol2, fcol3 = st.columns([1.1, 1.1, 1.1], gap="large")
-
-with fcol1:
-    st.markdown('<div class="card-strong">', unsafe_allow_html=True)
-    st.markdown('<div class="block-title">오프라인 채널별 실적</div>', unsafe_allow_html=True)
-
-    st.session_state.off_selected = st.radio(
-        "오프라인 선택",
-        options=off_targets,
-        index=off_targets.index(st.session_state.off_selected) if st.session_state.off_selected in off_targets else 0,
-        label_visibility="collapsed",
-        key="off_radio",
-    )
+    with ocol1:
+        st.markdown('<div class="card-strong">', unsafe_allow_html=True)
+        st.markdown('<div class="block-title">온라인 채널별 실적</div>', unsafe_allow_html=True)
 
-    offline_total_sales = DATA["total"]["오프라인"]["sales"]
-    alloc = {
-        "오프라인 전체": offline_total_sales,
-        "백화점": int(offline_total_sales * 0.70),
-        "대리점": int(offline_total_sales * 0.20),
-        "직영점": int(offline_total_sales * 0.10),
-    }
-    rows = []
-    for k in off_targets:
-        qty = DATA["off"][k]["qty"]
-        sales = alloc.get(k, int(offline_total_sales * 0.05))
-        ratio = round(_ratio(sales, offline_total_sales), 1) if k != "오프라인 전체" else 100.0
-        rows.append({"채널명": k, "매출액": f"{sales:,}", "수량": f"{qty:,}", "비중(%)": ratio})
-    df_off_sum = pd.DataFrame(rows)
-    st.dataframe(_highlight_selected(df_off_sum, "채널명", st.session_state.off_selected), use_container_width=True, height=330)
-    st.markdown("</div>", unsafe_allow_html=True)
+        # Build summary table like HTML list (sub-channel sales derived from the cube)
+        rows = []
+        for k in on_targets:
+            qty, sales = cube.total(**_scope(k))
+            ratio = round(_ratio(sales, on_sales), 1) if k != "온라인 전체" else 100.0
+            rows.append({"채널명": k, "매출액": sales, "수량": qty, "비중(%)": ratio})
+        df_on_sum = pd.DataFrame(rows)
+        _selectable_table(df_on_sum, on_targets, "on_selected", height=330)
+        st.markdown("</div>", unsafe_allow_html=True)
 
-off_d = DATA["off"].get(st.session_state.off_selected, DATA["off"]["오프라인 전체"])
+    on_tables = cube.tables(("color", "size"), **_scope(st.session_state.on_selected))
 
-with fcol2:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown(f'<div class="block-title">컬러별 판매 현황 <span class="badge badge-red">{st.session_state.off_selected}</span></div>', unsafe_allow_html=True)
-    df = _table_from_dict(off_d["colors"], off_d["qty"], "컬러")
-    st.dataframe(df, use_container_width=True, height=330)
-    st.markdown("</div>", unsafe_allow_html=True)
+    with ocol2:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown(f'<div class="block-title">컬러별 판매 현황 <span class="badge badge-blue">{st.session_state.on_selected}</span></div>', unsafe_allow_html=True)
+        df = on_tables["color"]
+        st.dataframe(df, use_container_width=True, height=330, column_config=NUMBER_COLUMNS)
+        st.markdown("</div>", unsafe_allow_html=True)
 
-with fcol3:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown(f'<div class="block-title">사이즈별 판매 현황 <span class="badge badge-red">{st.session_state.off_selected}</span></div>', unsafe_allow_html=True)
-    df = _table_from_dict(off_d["sizes"], off_d["qty"], "사이즈")
-    st.dataframe(df, use_container_width=True, height=330)
-    st.markdown("</div>", unsafe_allow_html=True)
+    with ocol3:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown(f'<div class="block-title">사이즈별 판매 현황 <span class="badge badge-blue">{st.session_state.on_selected}</span></div>', unsafe_allow_html=True)
+        df = on_tables["size"]
+        st.dataframe(df, use_container_width=True, height=330, column_config=NUMBER_COLUMNS)
+        st.markdown("</div>", unsafe_allow_html=True)
 
-st.write("")
-
-st.markdown('<div class="card">', unsafe_allow_html=True)
-cA, cB = st.columns([1.4, 2.6])
-with cA:
-    st.markdown(f'<div class="small-label">OFFLINE TREND: {st.session_state.off_selected}</div>', unsafe_allow_html=True)
-with cB:
-    cc1, cc2 = st.columns([1, 1])
-    with cc1:
-        st.session_state.off_metric = st.radio(
-            "off_metric",
-            options=["sales", "qty"],
-            horizontal=True,
-            index=["sales", "qty"].index(st.session_state.off_metric),
-            format_func=lambda x: "매출" if x == "sales" else "수량",
-            label_visibility="collapsed",
-            key="off_metric_radio",
-        )
-    with cc2:
-        st.session_state.off_view = st.radio(
-            "off_view",
-            options=["daily", "weekly", "monthly"],
-            horizontal=True,
-            index=["daily", "weekly", "monthly"].index(st.session_state.off_view),
-            format_func=lambda x: {"daily": "일", "weekly": "주", "monthly": "월"}[x],
-            label_visibility="collapsed",
-            key="off_view_radio",
-        )
-
-trend_df = make_trend_series(
-    seed_key=f"off|{st.session_state.brand}|{st.session_state.off_selected}|{st.session_state.off_metric}|{st.session_state.off_view}",
-    metric=st.session_state.off_metric,
-    view=st.session_state.off_view,
-    mode="off",
-    selected=st.session_state.off_selected,
-)
-pivot = trend_df.pivot_table(index="x", columns="series", values="value", aggfunc="sum").reset_index().set_index("x")
-st.line_chart(pivot, height=280)
-st.markdown("</div>", unsafe_allow_html=True)
+    st.write("")
 
-st.write("")
+    render_trend_chart("on", f"ONLINE TREND: {st.session_state.on_selected}", "on", st.session_state.on_selected, selection)
 
-# Offline: Shop TOP 15 + Region table (HTML uses random; we keep deterministic random)
-shop_col, region_col = st.columns([1, 1], gap="large")
+    st.write("")
+    st.markdown('<div class="hr-gap"></div>', unsafe_allow_html=True)
 
-def make_shop_rank(seed_key: str, label_prefix: str) -> pd.DataFrame:
-    rnd = random.Random(seed_key)
-    rows = []
-    for i in range(1, 16):
-        sales = rnd.randint(2_000_000, 7_000_000)
-        rows.append({"순위": i, "매장명": f"{label_prefix} 매장 {i}호점", "매출액": f"{sales:,}원", "수량": int(sales / 80_000)})
-    return pd.DataFrame(rows)
 
-with shop_col:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown(f'<div class="block-title">오프라인 매장 실적 TOP 15 <span class="badge badge-slate">{st.session_state.off_selected}</span></div>', unsafe_allow_html=True)
-    df = make_shop_rank(f"shop|{st.session_state.off_selected}|{st.session_state.brand}", st.session_state.off_selected.replace(" 전체", ""))
-    st.dataframe(df, use_container_width=True, height=360)
-    st.markdown("</div>", unsafe_allow_html=True)
+render_online_section(cube, selection)
 
-with region_col:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown(f'<div class="block-title">전국 지역별 매출 분포 <span class="badge badge-slate">{st.session_state.off_selected}</span></div>', unsafe_allow_html=True)
-    geo = off_d.get("geo", {})
-    rows = []
-    for region, qty in geo.items():
-        sales = int(qty) * 75_000
-        rows.append({"Region": region, "매출액": f"{sales:,}원", "수량": f"{int(qty):,}", "비중(%)": round(_ratio(float(qty), float(off_d["qty"])), 1)})
-    df = pd.DataFrame(rows).sort_values("비중(%)", ascending=False).reset_index(drop=True)
-    st.dataframe(df, use_container_width=True, height=360)
-    st.markdown("</div>", unsafe_allow_html=True)
+# ---- Offline Performance Detailed
+@st.fragment
+def render_offline_section(cube: SalesCube, selection: SalesFilter) -> None:
+    """Offline channel table, color/size and OFFLINE trend."""
+    st.markdown('<div class="block-title">Offline Performance Detailed</div>', unsafe_allow_html=True)
+
+    if "off_selected" not in st.session_state:
+        st.session_state.off_selected = "오프라인 전체"
+
+    _, off_sales = cube.total(channel=OFF_CHANNEL)
+    off_targets = _channel_targets(cube, "off")
+    fcol1, fcol2, fcol3 = st.columns([1.1, 1.1, 1.1], gap="large")
+
+    with fcol1:
+        st.markdown('<div class="card-strong">', unsafe_allow_html=True)
+        st.markdown('<div class="block-title">오프라인 채널별 실적</div>', unsafe_allow_html=True)
+
+        rows = []
+        for k in off_targets:
+            qty, sales = cube.total(**_scope(k))
+            ratio = round(_ratio(sales, off_sales), 1) if k != "오프라인 전체" else 100.0
+            rows.append({"채널명": k, "매출액": sales, "수량": qty, "비중(%)": ratio})
+        df_off_sum = pd.DataFrame(rows)
+        prev_off = st.session_state.off_selected
+        _selectable_table(df_off_sum, off_targets, "off_selected", height=330)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    # Shop/region panels are a separate fragment keyed on this selection: refresh them with a full rerun.
+    if st.session_state.off_selected != prev_off:
+        st.rerun()
+
+    off_tables = cube.tables(("color", "size"), **_scope(st.session_state.off_selected))
+
+    with fcol2:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown(f'<div class="block-title">컬러별 판매 현황 <span class="badge badge-red">{st.session_state.off_selected}</span></div>', unsafe_allow_html=True)
+        df = off_tables["color"]
+        st.dataframe(df, use_container_width=True, height=330, column_config=NUMBER_COLUMNS)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with fcol3:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown(f'<div class="block-title">사이즈별 판매 현황 <span class="badge badge-red">{st.session_state.off_selected}</span></div>', unsafe_allow_html=True)
+        df = off_tables["size"]
+        st.dataframe(df, use_container_width=True, height=330, column_config=NUMBER_COLUMNS)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    st.write("")
+
+    render_trend_chart("off", f"OFFLINE TREND: {st.session_state.off_selected}", "off", st.session_state.off_selected, selection)
+
+    st.write("")
+
+
+render_offline_section(cube, selection)
+
+
+def _shift_shop_page(step: int) -> None:
+    st.session_state.shop_page = max(0, st.session_state.shop_page + step)
+
+
+@st.fragment
+def render_shop_region_section(selection: SalesFilter) -> None:
+    """Store TOP 15 (paged) and region table for the offline channel picked above."""
+    off_f = _scope(st.session_state.off_selected)
+    shop_col, region_col = st.columns([1, 1], gap="large")
+
+    with shop_col:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown(f'<div class="block-title">오프라인 매장 실적 TOP 15 <span class="badge badge-slate">{st.session_state.off_selected}</span></div>', unsafe_allow_html=True)
+        stores, stores_err = load_stores(selection, selection_gen(selection))
+        if stores_err:
+            st.caption(f"매장 데이터 로드 실패: {stores_err}")
+        sub = off_f.get("sub_channel")
+        # Page resets whenever the offline channel or the selection changes.
+        page_scope = (st.session_state.off_selected, selection)
+        if st.session_state.get("shop_page_scope") != page_scope:
+            st.session_state.shop_page_scope = page_scope
+            st.session_state.shop_page = 0
+        n_stores = stores.count(sub)
+        last_page = max(0, (n_stores - 1) // PAGE_SIZE)
+
+        pcol1, pcol2, pcol3 = st.columns([1, 2, 1])
+        page = min(st.session_state.shop_page, last_page)
+        with pcol1:
+            st.button("이전", key="shop_prev", disabled=page == 0, on_click=_shift_shop_page, args=(-1,), use_container_width=True)
+        with pcol3:
+            st.button("다음 15", key="shop_next", disabled=page >= last_page, on_click=_shift_shop_page, args=(1,), use_container_width=True)
+        with pcol2:
+            shown = f"{page * PAGE_SIZE + 1:,}–{min((page + 1) * PAGE_SIZE, n_stores):,}위 / " if n_stores else ""
+            st.caption(f"{shown}전체 {n_stores:,}개 매장")
+
+        df = stores.page(sub, page)
+        st.dataframe(df, use_container_width=True, height=360, hide_index=True, column_config=NUMBER_COLUMNS)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with region_col:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown(f'<div class="block-title">전국 지역별 매출 분포 <span class="badge badge-slate">{st.session_state.off_selected}</span></div>', unsafe_allow_html=True)
+        regions, _ = load_region_index(selection, selection_gen(selection))
+        st.dataframe(regions.table(st.session_state.off_selected), use_container_width=True, height=360, column_config=NUMBER_COLUMNS)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+
+render_shop_region_section(selection)
 
 # -----------------------------
 # GROUP 2: CUSTOMER ANALYSIS
@@ -801,111 +589,115 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-cust_targets = ["회원 전체", "온라인", "자사몰", "오프라인"]  # HTML 리스트 핵심 선택지
-if "cust_selected" not in st.session_state:
-    st.session_state.cust_selected = "회원 전체"
-if "age_metric" not in st.session_state:
-    st.session_state.age_metric = "sales"
-
-ccol1, ccol2, ccol3 = st.columns([1.1, 1.1, 1.1], gap="large")
-
-with ccol1:
-    st.markdown('<div class="card-strong">', unsafe_allow_html=True)
-    st.markdown('<div class="block-title">회원 채널별 실적</div>', unsafe_allow_html=True)
-
-    st.session_state.cust_selected = st.radio(
-        "회원 선택",
-        options=cust_targets,
-        index=cust_targets.index(st.session_state.cust_selected) if st.session_state.cust_selected in cust_targets else 0,
-        label_visibility="collapsed",
-        key="cust_radio",
-    )
-
-    # Build a simple summary table similar to HTML 3-depth feel
-    # (회원 전체 -> 온라인 -> 자사몰, 회원 전체 -> 오프라인)
-    d_all = DATA["cust"]["회원 전체"]
-    d_on = DATA["cust"]["온라인"]
-    d_off = DATA["cust"]["오프라인"]
-    df = pd.DataFrame(
-        [
-            {"채널 구분": "회원 전체", "매출액": f'{d_all["sales"]:,}', "수량": f'{d_all["qty"]:,}', "비중(%)": 100.0},
-            {"채널 구분": "└ 온라인", "매출액": f'{d_on["sales"]:,}', "수량": f'{d_on["qty"]:,}', "비중(%)": round(_ratio(d_on["sales"], d_all["sales"]), 1)},
-            {"채널 구분": "   └ 자사몰", "매출액": f'{d_on["sales"]:,}', "수량": f'{d_on["qty"]:,}', "비중(%)": 100.0},
-            {"채널 구분": "└ 오프라인", "매출액": f'{d_off["sales"]:,}', "수량": f'{d_off["qty"]:,}', "비중(%)": round(_ratio(d_off["sales"], d_all["sales"]), 1)},
-        ]
-    )
-    # Highlight approximate: match selected to rows
-    key_map = {
-        "회원 전체": "회원 전체",
-        "온라인": "└ 온라인",
-        "자사몰": "   └ 자사몰",
-        "오프라인": "└ 오프라인",
-    }
-    st.dataframe(_highlight_selected(df, "채널 구분", key_map.get(st.session_state.cust_selected, "회원 전체")), use_container_width=True, height=330)
-    st.markdown("</div>", unsafe_allow_html=True)
-
-cust_d = DATA["cust"].get(st.session_state.cust_selected, DATA["cust"]["회원 전체"])
-
-with ccol2:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown(f'<div class="block-title">컬러별 판매 현황 <span class="badge badge-purple">{st.session_state.cust_selected}</span></div>', unsafe_allow_html=True)
-    df = _table_from_dict(cust_d["colors"], cust_d["qty"], "컬러")
-    st.dataframe(df, use_container_width=True, height=330)
-    st.markdown("</div>", unsafe_allow_html=True)
-
-with ccol3:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown(f'<div class="block-title">사이즈별 판매 현황 <span class="badge badge-purple">{st.session_state.cust_selected}</span></div>', unsafe_allow_html=True)
-    df = _table_from_dict(cust_d["sizes"], cust_d["qty"], "사이즈")
-    st.dataframe(df, use_container_width=True, height=330)
-    st.markdown("</div>", unsafe_allow_html=True)
-
-st.write("")
-
-mcol1, mcol2 = st.columns([1.05, 1.95], gap="large")
 
-with mcol1:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    # HTML: title "기존/신규 회원" + badge
-    badge_name = st.session_state.cust_selected if ("전체" in st.session_state.cust_selected or st.session_state.cust_selected == "자사몰") else f"{st.session_state.cust_selected} 전체"
-    st.markdown(f'<div class="block-title">기존/신규 회원 <span class="badge badge-purple">{badge_name}</span></div>', unsafe_allow_html=True)
-
-    members = cust_d["members"]
-    total_sales = cust_d["sales"]
-    total_qty = cust_d["qty"]
-    rows = [{"회원 구분": st.session_state.cust_selected, "매출액": f"{total_sales:,}", "수량": f"{total_qty:,}", "비중(%)": 100.0}]
-    for k, v in members.items():
-        rows.append({"회원 구분": k, "매출액": f'{v["sales"]:,}', "수량": f'{v["qty"]:,}', "비중(%)": round(_ratio(v["qty"], total_qty), 1)})
-    st.dataframe(pd.DataFrame(rows), use_container_width=True, height=360)
-    st.markdown("</div>", unsafe_allow_html=True)
+@st.fragment
+def render_customer_section(cube: SalesCube, selection: SalesFilter) -> None:
+    """Member channel table, color/size, 기존/신규 and 성별/연령대 panels."""
+    cust_targets = ["회원 전체", "온라인", "자사몰", "오프라인"]  # HTML 리스트 핵심 선택지
+    all_qty, all_sales = cube.total()
+    on_qty, on_sales = cube.total(channel=ON_CHANNEL)
+    off_qty, off_sales = cube.total(channel=OFF_CHANNEL)
+    if "cust_selected" not in st.session_state:
+        st.session_state.cust_selected = "회원 전체"
+    if "age_metric" not in st.session_state:
+        st.session_state.age_metric = "sales"
+
+    ccol1, ccol2, ccol3 = st.columns([1.1, 1.1, 1.1], gap="large")
+
+    with ccol1:
+        st.markdown('<div class="card-strong">', unsafe_allow_html=True)
+        st.markdown('<div class="block-title">회원 채널별 실적</div>', unsafe_allow_html=True)
+
+        # Build a simple summary table similar to HTML 3-depth feel
+        # (회원 전체 -> 온라인 -> 자사몰, 회원 전체 -> 오프라인)
+        own_qty, own_sales = cube.total(sub_channel="자사몰")
+        df = pd.DataFrame(
+            [
+                {"채널 구분": "회원 전체", "매출액": all_sales, "수량": all_qty, "비중(%)": 100.0},
+                {"채널 구분": "└ 온라인", "매출액": on_sales, "수량": on_qty, "비중(%)": round(_ratio(on_sales, all_sales), 1)},
+                {"채널 구분": "   └ 자사몰", "매출액": own_sales, "수량": own_qty, "비중(%)": round(_ratio(own_sales, on_sales), 1)},
+                {"채널 구분": "└ 오프라인", "매출액": off_sales, "수량": off_qty, "비중(%)": round(_ratio(off_sales, all_sales), 1)},
+            ]
+        )
+        # rows are in cust_targets order (회원 전체 / 온라인 / 자사몰 / 오프라인)
+        _selectable_table(df, cust_targets, "cust_selected", height=330)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    cust_f = _scope(st.session_state.cust_selected)
+    cust_qty, cust_sales = cube.total(**cust_f)
+    cust_tables = cube.tables(("color", "size"), **cust_f)
+
+    with ccol2:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown(f'<div class="block-title">컬러별 판매 현황 <span class="badge badge-purple">{st.session_state.cust_selected}</span></div>', unsafe_allow_html=True)
+        df = cust_tables["color"]
+        st.dataframe(df, use_container_width=True, height=330, column_config=NUMBER_COLUMNS)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with ccol3:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown(f'<div class="block-title">사이즈별 판매 현황 <span class="badge badge-purple">{st.session_state.cust_selected}</span></div>', unsafe_allow_html=True)
+        df = cust_tables["size"]
+        st.dataframe(df, use_container_width=True, height=330, column_config=NUMBER_COLUMNS)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    st.write("")
+
+    mcol1, mcol2 = st.columns([1.05, 1.95], gap="large")
+
+    with mcol1:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        # HTML: title "기존/신규 회원" + badge
+        badge_name = st.session_state.cust_selected if ("전체" in st.session_state.cust_selected or st.session_state.cust_selected == "자사몰") else f"{st.session_state.cust_selected} 전체"
+        st.markdown(f'<div class="block-title">기존/신규 회원 <span class="badge badge-purple">{badge_name}</span></div>', unsafe_allow_html=True)
+
+        split, _ = load_member_split(selection, selection_gen(selection))
+        members = split.table(**cust_f) if split is not None else cube.rollup(("member_type",), **cust_f)
+        mem_qty, mem_sales = int(members["qty"].sum()), int(members["sales"].sum())
+        rows = [{"회원 구분": st.session_state.cust_selected, "매출액": mem_sales, "수량": mem_qty, "비중(%)": 100.0}]
+        for k, v in members.iterrows():
+            rows.append({"회원 구분": k, "매출액": int(v["sales"]), "수량": int(v["qty"]), "비중(%)": round(_ratio(v["qty"], mem_qty), 1)})
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, height=360, column_config=NUMBER_COLUMNS)
+        st.markdown("</div>", unsafe_allow_html=True)
+
+    with mcol2:
+        st.markdown('<div class="card">', unsafe_allow_html=True)
+        st.markdown('<div class="block-title">성별/연령대 분석</div>', unsafe_allow_html=True)
+        st.session_state.age_metric = st.radio(
+            "age_metric",
+            options=["sales", "qty"],
+            horizontal=True,
+            index=["sales", "qty"].index(st.session_state.age_metric),
+            format_func=lambda x: "매출액" if x == "sales" else "판매량",
+            label_visibility="collapsed",
+            key="age_metric_radio",
+        )
 
-with mcol2:
-    st.markdown('<div class="card">', unsafe_allow_html=True)
-    st.markdown('<div class="block-title">성별/연령대 분석</div>', unsafe_allow_html=True)
-    st.session_state.age_metric = st.radio(
-        "age_metric",
-        options=["sales", "qty"],
-        horizontal=True,
-        index=["sales", "qty"].index(st.session_state.age_metric),
-        format_func=lambda x: "매출액" if x == "sales" else "판매량",
-        label_visibility="collapsed",
-        key="age_metric_radio",
-    )
+        demo, _ = load_demographics(selection, selection_gen(selection))
+        df_age = demo.age_gender(st.session_state.age_metric, **cust_f)
+        st.bar_chart(chart_frame(df_age, method="minmax"), height=360)
+        st.markdown("</div>", unsafe_allow_html=True)
 
-    age_gender = cust_d.get("ageGender", {})
-    male = age_gender.get("male", {})
-    female = age_gender.get("female", {})
 
-    x = AGE_LABELS
-    male_vals = [(male.get(a, {"qty": 0, "sales": 0})["sales" if st.session_state.age_metric == "sales" else "qty"]) for a in x]
-    female_vals = [(female.get(a, {"qty": 0, "sales": 0})["sales" if st.session_state.age_metric == "sales" else "qty"]) for a in x]
+render_customer_section(cube, selection)
 
-    df_age = pd.DataFrame({"연령대": x, "남성": male_vals, "여성": female_vals}).set_index("연령대")
-    st.bar_chart(df_age, height=360)
-    st.markdown("</div>", unsafe_allow_html=True)
 
 # Footer spacing
 st.write("")
 st.caption("Ported layout from index.html (StyleCode Data Lab v2.9).")
 
+with st.expander("시스템 상태", expanded=False):
+    flights = get_flights().metrics()
+    st.caption(f"KPI API 요청: 호출 {flights['calls']:,} / 실제 요청 {flights['executions']:,} / 병합 {flights['coalesced']:,} / 진행 중 {flights['in_flight']:,}")
+    w = warmup.status()
+    took = f"{w.duration:.1f}s" if w.duration is not None else "-"
+    st.caption(f"워밍업: {w.state} (회차 {w.passes}, 소요 {took}) / KPI {w.kpis} / 큐브 {w.cubes} / 스냅샷 {w.snapshots} / 오류 {w.errors}")
+    through = read_through(SNAPSHOT_DIR, st.session_state.brand)
+    st.caption(f"데이터 소스: {'오프라인 (로컬 스냅샷)' if OFFLINE else '온라인'} / 스냅샷 기준일: {through or '-'}")
+
+# Fill the KPI card last: whatever is left of its latency budget overlaps with rendering the page above.
+render_kpi(kpi_slot, kpi_pending.result())
+if not kpi_pending.done():
+    poll_kpi(kpi_pending)
+
 
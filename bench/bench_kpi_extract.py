@@ -0,0 +1,58 @@
+# bench/bench_kpi_extract.py
+# Micro-benchmark: KPI JSON extraction from a Streamlit-hosted HTML page.
+# Notes:
+# - Compares the previous regex chain (kept here verbatim) with kpi.extract_json_object on synthetic pages
+#   of growing size: CSS/JS noise full of braces, the payload near the end.
+# - Run from the repo root: python bench/bench_kpi_extract.py
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kpi import extract_json_object  # noqa: E402
+
+PATTERNS = [
+    r'(\{[\s\S]*"sales_amt"[\s\S]*"generated_at"[\s\S]*?\})',
+    r'(\{[\s\S]*"sales_amt"[\s\S]*?\})',
+    r'(\{[\s\S]*?\})',
+]
+
+NOISE = ".stApp div[data-testid=\"block\"] { margin: 0; padding: 4px; } function f(a){ return {x: a}; }\n"
+PAYLOAD = {"brand": "X", "month": "2026-10", "sales_amt": 1234567890, "generated_at": "2026-10-17 09:00:00"}
+
+
+def regex_chain(text: str):
+    for p in PATTERNS:
+        m = re.search(p, text)
+        if m:
+            try:
+                return json.loads(m.group(1))
+            except Exception:
+                pass
+    return None
+
+
+def make_page(size: int) -> str:
+    body = NOISE * (size // len(NOISE))
+    return f"<html><head><style>{body}</style></head><body><pre>{json.dumps(PAYLOAD)}</pre><script>{NOISE * 20}</script></body></html>"
+
+
+def main() -> None:
+    print(f"{'page':>10} {'regex chain':>14} {'extractor':>14} {'speedup':>9}  ok")
+    for size in (16_000, 128_000, 512_000, 2_000_000):
+        page = make_page(size)
+        n = 3 if size > 500_000 else 20
+        t_re = min(timeit.repeat(lambda: regex_chain(page), number=n, repeat=3)) / n
+        t_ex = min(timeit.repeat(lambda: extract_json_object(page), number=n, repeat=3)) / n
+        ok = extract_json_object(page) == PAYLOAD
+        print(f"{len(page):>10,} {t_re * 1e3:>11.2f} ms {t_ex * 1e3:>11.3f} ms {t_re / t_ex:>8.0f}x  {ok} (regex: {regex_chain(page) == PAYLOAD})")
+
+
+if __name__ == "__main__":
+    main()
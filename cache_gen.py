@@ -0,0 +1,47 @@
+# cache_gen.py
+# Versioned, key-scoped cache invalidation for the "조회하기" button.
+# Notes:
+# - Cached loaders take a `gen` argument; the generation is part of their cache key.
+# - Refreshing a scope (e.g. one brand/month) builds the NEXT generation in the clicking session only;
+#   every other session keeps reading the current generation until the new data is published.
+# - Nothing outside the refreshed scope is touched (no global st.cache_data.clear()).
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Hashable, Tuple
+
+import streamlit as st
+
+
+class CacheGenerations:
+    def __init__(self):
+        self._current: Dict[Hashable, int] = {}
+        self._pending: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def current(self, key: Hashable) -> int:
+        return self._current.get(key, 0)
+
+    def begin(self, key: Hashable) -> Tuple[int, int]:
+        """
+        Start a refresh of `key`; returns (old generation, generation to build).
+        Concurrent refreshes of the same key share one pending generation.
+        """
+        with self._lock:
+            old = self._current.get(key, 0)
+            new = self._pending.setdefault(key, old + 1)
+            return old, new
+
+    def publish(self, key: Hashable, gen: int) -> None:
+        """Make `gen` current once its entries are built; stale readers switch on their next rerun."""
+        with self._lock:
+            if gen > self._current.get(key, 0):
+                self._current[key] = gen
+            if self._pending.get(key) == gen:
+                del self._pending[key]
+
+
+@st.cache_resource
+def get_generations() -> CacheGenerations:
+    return CacheGenerations()
@@ -0,0 +1,125 @@
+# catalog.py
+# Style-code catalog index behind the Style Code picker.
+# Notes:
+# - One index per brand (st.cache_resource), built from data/catalog/<brand>.csv (stylecode, category,
+#   style_name), else the style codes the warehouse has sold, else the simulated catalog.
+# - Per scope (every category, and each category alone) the upper-cased codes and names are one sorted array:
+#   a prefix query is two binary searches and a slice, so a keystroke costs O(log n + k) however big the
+#   catalog is. Only when prefixes yield fewer than `limit` hits does a vectorized substring scan run.
+# - The picker ships just the top matches (plus the current selection) to the browser, never the catalog.
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from sample_data import simulated_catalog
+from warehouse import load_catalog_codes
+
+CATALOG_DIR = "data/catalog"
+SEARCH_LIMIT = 50
+
+
+class _Scope:
+    """Sorted search keys (codes and names, upper-cased) of some catalog rows, plus a substring haystack."""
+
+    def __init__(self, rows: np.ndarray, codes: np.ndarray, names: np.ndarray):
+        keys = np.concatenate([codes[rows], names[rows]])
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.rows = np.concatenate([rows, rows])[order]
+        self.all_rows = rows  # in code order
+        self.haystack = np.char.add(np.char.add(codes[rows], " "), names[rows])
+
+    def prefix(self, q: str, limit: int) -> np.ndarray:
+        lo = np.searchsorted(self.keys, q, side="left")
+        hi = np.searchsorted(self.keys, q + "\uffff", side="left")
+        return self.rows[lo: min(hi, lo + 2 * limit)]  # a row can match by code and by name
+
+    def substring(self, q: str) -> np.ndarray:
+        return self.all_rows[np.char.find(self.haystack, q) >= 0]
+
+
+class CatalogIndex:
+    def __init__(self, df: pd.DataFrame):
+        """df: [stylecode, category] and optionally style_name; a code may be listed under several categories."""
+        df = df.dropna(subset=["stylecode"]).astype(str).drop_duplicates(["stylecode", "category"])
+        df = df.sort_values(["stylecode", "category"])
+        self.codes = df["stylecode"].to_numpy(dtype=str)
+        self.categories = df["category"].to_numpy(dtype=str)
+        names = df["style_name"] if "style_name" in df.columns else df["stylecode"]
+        self.names = names.to_numpy(dtype=str)
+        self._labels = dict(zip(self.codes, self.names))
+
+        upper_codes, upper_names = np.char.upper(self.codes), np.char.upper(self.names)
+        first = np.flatnonzero(~df["stylecode"].duplicated().to_numpy())
+        self._scopes: Dict[Optional[str], _Scope] = {None: _Scope(first, upper_codes, upper_names)}
+        for cat in np.unique(self.categories):
+            self._scopes[str(cat)] = _Scope(np.flatnonzero(self.categories == cat), upper_codes, upper_names)
+        self._memo: Dict[Tuple[str, Tuple[str, ...], int], List[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def label(self, code: str) -> str:
+        name = self._labels.get(code)
+        return code if not name or name == code else f"{name} ({code})"
+
+    def search(self, query: str, categories: Sequence[str] = (), limit: int = SEARCH_LIMIT) -> List[str]:
+        """
+        Top `limit` style codes for `query` within `categories` (empty = every category).
+        Prefix matches on code or name come first, then substring matches; ties in code order.
+        """
+        q = query.strip().upper()
+        cats = tuple(sorted(set(categories)))
+        key = (q, cats, limit)
+        hit = self._memo.get(key)
+        if hit is not None:
+            return hit
+
+        scopes = [self._scopes[c] for c in cats if c in self._scopes] if cats else [self._scopes[None]]
+        if not scopes:
+            rows = np.empty(0, dtype=np.int64)
+        elif not q:
+            rows = np.sort(np.concatenate([s.all_rows[:limit] for s in scopes]))
+        else:
+            tiers = [np.unique(np.concatenate([s.prefix(q, limit) for s in scopes]))]
+            if len(tiers[0]) < limit:
+                tiers.append(np.concatenate([s.substring(q) for s in scopes]))
+            rows = np.concatenate(tiers)
+        out = list(dict.fromkeys(str(x) for x in self.codes[rows]))[:limit]  # de-duplicated, tier order kept
+
+        with self._lock:
+            if len(self._memo) > 4096:
+                self._memo.clear()
+            self._memo[key] = out
+        return out
+
+
+def read_catalog(brand: str) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """(catalog file of the brand, error_message); (None, None) when there is no file."""
+    path = os.path.join(CATALOG_DIR, f"{brand}.csv")
+    if not os.path.exists(path):
+        return None, None
+    try:
+        return pd.read_csv(path, dtype=str), None
+    except Exception as e:
+        return None, str(e)
+
+
+@st.cache_resource(ttl=3600, max_entries=32)
+def get_catalog(brand: str) -> Tuple[CatalogIndex, Optional[str]]:
+    """(catalog index, error_message) per brand, shared by every session."""
+    df, err = read_catalog(brand)
+    if df is None:
+        df, wh_err = load_catalog_codes(brand)
+        err = err or wh_err
+    if df is None:
+        df = simulated_catalog()
+    return CatalogIndex(df), err
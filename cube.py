@@ -0,0 +1,206 @@
+# cube.py
+# Columnar sales fact table + lazily built cube answering any (dimensions, filter) breakdown.
+# Notes:
+# - Dimensions are pandas categoricals (a 10M-row month is ~10 bytes/row of codes + int measures).
+# - A cube is a set of materialized "cuboids" (frames grouped by some dims). A query is answered from the
+#   smallest cuboid containing every dim it groups or filters on, then memoized, so repeated panel lookups
+#   are dict hits and unfiltered roll-ups become new, smaller cuboids for later queries.
+# - Source is either the simulated unit-level facts or the warehouse GROUPING SETS result (warehouse.py),
+#   for one SalesFilter (filters.py).
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cache_gen import get_generations
+from filters import SalesFilter
+from sample_data import simulate_facts
+from warehouse import DIMENSIONS, Grouping, load_page_cuboids
+
+MEASURES = ["qty", "sales"]
+
+# Column header for a dimension when rendered as a breakdown table.
+DIM_LABELS = {"color": "컬러", "size": "사이즈", "region": "Region"}
+
+
+def to_fact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize any fact/cuboid frame: categorical dims, integer measures."""
+    out = {}
+    for col in df.columns:
+        if col in DIMENSIONS:
+            out[col] = df[col].astype("category")
+        elif col == "qty":
+            out[col] = pd.to_numeric(df[col]).fillna(0).astype("int32")
+        elif col == "sales":
+            out[col] = pd.to_numeric(df[col]).fillna(0).astype("int64")
+    return pd.DataFrame(out)
+
+
+class SalesCube:
+    def __init__(self, cuboids: Dict[Grouping, pd.DataFrame]):
+        self._cuboids: Dict[frozenset, pd.DataFrame] = {}
+        for dims, df in cuboids.items():
+            self._cuboids[frozenset(dims)] = to_fact_frame(df)
+        self._memo: Dict[Tuple[Grouping, Tuple[Tuple[str, str], ...]], pd.DataFrame] = {}
+        self._tables: Dict[Tuple[Grouping, Tuple[Tuple[str, str], ...]], Dict[str, pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_facts(cls, facts: pd.DataFrame) -> "SalesCube":
+        return cls({tuple(c for c in facts.columns if c in DIMENSIONS): facts})
+
+    def _source(self, needed: frozenset) -> pd.DataFrame:
+        candidates = [df for dims, df in self._cuboids.items() if needed <= dims]
+        if not candidates:
+            raise KeyError(f"no cuboid covers {sorted(needed)}")
+        return min(candidates, key=len)
+
+    def rollup(self, dims: Sequence[str], **filters: str) -> pd.DataFrame:
+        """qty/sales grouped by `dims` (index) over rows matching `filters` (dim == value)."""
+        key = (tuple(dims), tuple(sorted(filters.items())))
+        hit = self._memo.get(key)
+        if hit is not None:
+            return hit
+
+        src = self._source(frozenset(dims) | frozenset(filters))
+        if filters:
+            mask = pd.Series(True, index=src.index)
+            for col, val in filters.items():
+                mask &= src[col] == val
+            src = src[mask]
+        if dims:
+            out = src.groupby(list(dims), observed=True, sort=False)[MEASURES].sum()
+        else:
+            out = src[MEASURES].sum().to_frame().T
+
+        with self._lock:
+            self._memo[key] = out
+            if not filters and dims and frozenset(dims) not in self._cuboids:
+                self._cuboids[frozenset(dims)] = out.reset_index()
+        return out
+
+    def total(self, **filters: str) -> Tuple[int, int]:
+        row = self.rollup((), **filters)
+        return int(row["qty"].iloc[0]), int(row["sales"].iloc[0])
+
+    def breakdown(self, dim: str, measure: str = "qty", **filters: str) -> pd.Series:
+        return self.rollup((dim,), **filters)[measure].sort_values(ascending=False)
+
+    def members(self, dim: str, **filters: str) -> List[str]:
+        """Values of `dim` under `filters`, largest sales first (e.g. the sub-channels of 온라인)."""
+        return [str(x) for x in self.breakdown(dim, "sales", **filters).index]
+
+    def tables(self, dims: Sequence[str], **filters: str) -> Dict[str, pd.DataFrame]:
+        """
+        Ranked qty tables for several dims of one scope (e.g. color + size of '무신사'), built in one batch.
+        The cube lives per (brand, period, ...) selection, so this memo is per (brand, period, channel).
+        """
+        key = (tuple(dims), tuple(sorted(filters.items())))
+        hit = self._tables.get(key)
+        if hit is not None:
+            return hit
+        out = build_breakdowns(
+            {d: self.rollup((d,), **filters)["qty"] for d in dims},
+            {d: DIM_LABELS.get(d, d) for d in dims},
+        )
+        with self._lock:
+            self._tables[key] = out
+        return out
+
+
+# -----------------------------
+# Breakdown tables
+# -----------------------------
+def build_breakdowns(
+    parts: Mapping[str, pd.Series],
+    label_cols: Mapping[str, str],
+    value_col: str = "판매수량",
+) -> Dict[str, pd.DataFrame]:
+    """
+    Share-of-total, rank and sorted order for many breakdowns in one NumPy pass (no per-row Python).
+    - parts: name -> Series (label index -> value)
+    - returns name -> DataFrame[label, value, 비중(%)] sorted by value desc, index = 1-based rank
+    """
+    names = list(parts)
+    if not names:
+        return {}
+    lens = np.array([len(parts[n]) for n in names], dtype=np.int64)
+    values = np.concatenate([parts[n].to_numpy(dtype=np.float64) for n in names])
+    labels = np.concatenate([parts[n].index.astype(str).to_numpy(dtype=object) for n in names])
+    group = np.repeat(np.arange(len(names)), lens)
+
+    denom = np.bincount(group, weights=values, minlength=len(names))[group]
+    share = np.round(np.divide(values * 100.0, denom, out=np.zeros_like(values), where=denom > 0), 1)
+    order = np.lexsort((-values, group))  # by breakdown, then value desc
+    bounds = np.concatenate(([0], np.cumsum(lens)))
+
+    out: Dict[str, pd.DataFrame] = {}
+    for i, name in enumerate(names):
+        idx = order[bounds[i]: bounds[i + 1]]
+        out[name] = pd.DataFrame(
+            {label_cols[name]: labels[idx], value_col: values[idx].astype(np.int64), "비중(%)": share[idx]},
+            index=pd.RangeIndex(1, len(idx) + 1, name="순위"),
+        )
+    return out
+
+
+@st.cache_resource(ttl=600)
+def load_cube(flt: SalesFilter, gen: int = 0) -> Tuple[SalesCube, Optional[str]]:
+    """
+    Returns (cube, error_message), shared by every session for the same selection.
+    - gen: cache generation of the selection (see cache_gen.py); only part of the cache key
+    - warehouse configured: cube over the page's GROUPING SETS cuboids, filters pushed into the query
+    - otherwise (or on warehouse error): cube over the simulated unit-level facts that pass the filters
+    """
+    cuboids, err = load_page_cuboids(flt)
+    if cuboids is not None:
+        return SalesCube(cuboids), None
+    return SalesCube.from_facts(to_fact_frame(simulated_facts(flt))), err
+
+
+def simulated_facts(flt: SalesFilter) -> pd.DataFrame:
+    """The simulated unit-level facts that pass the filters (the simulated cube's source)."""
+    facts = simulate_facts(flt.brand)
+    return facts[flt.mask(facts)]
+
+
+def simulated_scope_totals(flt: SalesFilter) -> pd.DataFrame:
+    """qty/sales per (channel, sub_channel) of the simulated cube; other simulated panels are scaled to it."""
+    return simulated_facts(flt).groupby(["channel", "sub_channel"])[["qty", "sales"]].sum()
+
+
+def selection_gen(flt: SalesFilter) -> int:
+    """Current cache generation of a selection; other per-selection loaders (stores, members, ...) key on it too."""
+    return get_generations().current(("load_cube", flt))
+
+
+def scope_gen(flt: SalesFilter) -> int:
+    """Current cache generation of the selection's scope (no period), for period-independent stores (trends)."""
+    return get_generations().current(("scope", flt.scope))
+
+
+def current_cube(flt: SalesFilter) -> Tuple[SalesCube, Optional[str]]:
+    """load_cube at the selection's current cache generation."""
+    return load_cube(flt, selection_gen(flt))
+
+
+def rebuild_cube(flt: SalesFilter) -> Tuple[SalesCube, Optional[str]]:
+    """
+    Build the next generation of one selection, publish it, then drop the old one.
+    Other sessions keep reading the current generation until the new one is ready.
+    The scope generation moves too, so the trend store reloads the scope's days.
+    """
+    gens = get_generations()
+    scope = ("load_cube", flt)
+    old_gen, new_gen = gens.begin(scope)
+    out = load_cube(flt, new_gen)
+    gens.publish(scope, new_gen)
+    load_cube.clear(flt, old_gen)
+    _, scope_next = gens.begin(("scope", flt.scope))
+    gens.publish(("scope", flt.scope), scope_next)
+    return out
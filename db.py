@@ -0,0 +1,293 @@
+# db.py
+# Warehouse access layer for the dashboard.
+# Notes:
+# - One ConnectionPool per process (created through st.cache_resource), shared by every session and rerun,
+#   so the Snowflake login cost is paid once instead of on every widget click.
+# - Backends are pluggable: Snowflake in production, SQLite/DuckDB files as local stand-ins (tests, demos),
+#   and the local Arrow snapshot store (snapshot.py) for offline mode or as the fallback during outages.
+# - All SQL is written with qmark ("?") placeholders; every backend below accepts that style.
+
+from __future__ import annotations
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+import pandas as pd
+import streamlit as st
+
+try:
+    import snowflake.connector as snowflake_connector
+
+    snowflake_connector.paramstyle = "qmark"
+except Exception:
+    snowflake_connector = None  # optional in local/dev environments
+
+try:
+    import duckdb
+except Exception:
+    duckdb = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as pa_dataset
+    from pyarrow.fs import LocalFileSystem
+except Exception:
+    pa = None
+
+FACT_TABLE = os.environ.get("SALESMONITOR_FACT_TABLE", "sales_fact")
+SNAPSHOT_DIR = os.environ.get("SALESMONITOR_SNAPSHOT_DIR", "data/snapshots")
+OFFLINE = os.environ.get("SALESMONITOR_OFFLINE", "0") == "1"
+
+# Hive directories of the snapshot store: brand=<b>/month=<YYYY-MM>/sale_date=<YYYY-MM-DD>/part.arrow
+SNAPSHOT_PARTITIONS = ("brand", "month", "sale_date")
+
+
+class PoolTimeout(RuntimeError):
+    pass
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+class Backend:
+    """Creates raw DB-API connections. `dialect` lets SQL builders pick syntax per engine."""
+
+    name = "base"
+    dialect = "ansi"
+
+    def connect(self) -> Any:
+        raise NotImplementedError
+
+
+class SnowflakeBackend(Backend):
+    name = "snowflake"
+    dialect = "snowflake"
+
+    def __init__(self, params: Dict[str, Any]):
+        self.params = dict(params)
+
+    def connect(self) -> Any:
+        if snowflake_connector is None:
+            raise RuntimeError("snowflake-connector-python not available")
+        # keep_alive: pooled connections may sit idle between reruns for longer than the session heartbeat.
+        return snowflake_connector.connect(client_session_keep_alive=True, **self.params)
+
+
+class SQLiteBackend(Backend):
+    name = "sqlite"
+    dialect = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def connect(self) -> Any:
+        # Pool hands connections to whichever script thread checks them out.
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+
+class DuckDBBackend(Backend):
+    name = "duckdb"
+    dialect = "duckdb"
+
+    def __init__(self, path: str, read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+
+    def connect(self) -> Any:
+        if duckdb is None:
+            raise RuntimeError("duckdb not available")
+        return duckdb.connect(self.path, read_only=self.read_only)
+
+
+def snapshot_dataset(root: str) -> Any:
+    """Every snapshot file under `root` as one Arrow dataset, read memory-mapped (uncompressed IPC = zero-copy)."""
+    partitioning = pa_dataset.partitioning(pa.schema([(p, pa.string()) for p in SNAPSHOT_PARTITIONS]), flavor="hive")
+    return pa_dataset.dataset(root, format="ipc", partitioning=partitioning, filesystem=LocalFileSystem(use_mmap=True))
+
+
+def _snapshot_version(root: str) -> Tuple[Tuple[str, int], ...]:
+    """Modification times of the per-brand manifests; every sync rewrites its brand's manifest last."""
+    try:
+        brands = sorted(e.path for e in os.scandir(root) if e.is_dir() and e.name.startswith("brand="))
+    except OSError:
+        return ()
+    out = []
+    for path in brands:
+        try:
+            out.append((path, os.stat(os.path.join(path, "_manifest.json")).st_mtime_ns))
+        except OSError:
+            out.append((path, 0))
+    return tuple(out)
+
+
+class SnapshotBackend(Backend):
+    """
+    In-memory DuckDB with the snapshot dataset registered as the fact table, so warehouse SQL runs unchanged.
+    brand and sale_date predicates prune partition directories before any file is paged in.
+    """
+
+    name = "snapshot"
+    dialect = "duckdb"
+
+    def __init__(self, root: str, table: str = FACT_TABLE):
+        self.root = root
+        self.table = table
+
+    def connect(self) -> Any:
+        if duckdb is None or pa is None:
+            raise RuntimeError("duckdb and pyarrow are required for snapshots")
+        if not os.path.isdir(self.root):
+            raise RuntimeError(f"no snapshots in {self.root}")
+        return _SnapshotConnection(duckdb.connect(), self.table, self.root)
+
+
+class _SnapshotConnection:
+    """
+    DuckDB connection whose cursors all see the dataset (DuckDB registrations are per cursor).
+    The dataset is rediscovered whenever a manifest changed, so days synced after connect() are visible.
+    """
+
+    def __init__(self, conn: Any, table: str, root: str):
+        self._conn = conn
+        self.table = table
+        self.root = root
+        self._version: Optional[Tuple[Tuple[str, int], ...]] = None
+        self._dataset: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def dataset(self) -> Any:
+        version = _snapshot_version(self.root)
+        with self._lock:
+            if self._dataset is None or version != self._version:
+                self._dataset, self._version = snapshot_dataset(self.root), version
+            return self._dataset
+
+    def cursor(self) -> Any:
+        cur = self._conn.cursor()
+        cur.register(self.table, self.dataset)
+        return cur
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+# -----------------------------
+# Pool
+# -----------------------------
+class ConnectionPool:
+    """
+    Small thread-safe pool:
+    - at most `max_size` connections checked out at once (others wait up to `timeout` seconds)
+    - idle connections are reused LIFO so the warmest one is picked first
+    - a connection that raised during use is dropped instead of returned
+    """
+
+    def __init__(self, backend: Backend, max_size: int = 4, timeout: float = 30.0):
+        self.backend = backend
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    @property
+    def dialect(self) -> str:
+        return self.backend.dialect
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f"no {self.backend.name} connection free within {self.timeout:.0f}s")
+        conn = None
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self.backend.connect()
+            yield conn
+        except Exception:
+            self._discard(conn)
+            conn = None
+            raise
+        finally:
+            if conn is not None:
+                self._idle.put(conn)
+            self._slots.release()
+
+    def query_df(self, sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
+        """Run one parameterized query and return the result with lower-cased column names."""
+        with self.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(sql, tuple(params))
+                cols = [str(d[0]).lower() for d in cur.description]
+                rows = cur.fetchall()
+            finally:
+                cur.close()
+        return pd.DataFrame.from_records(rows, columns=cols)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    @staticmethod
+    def _discard(conn: Any) -> None:
+        if conn is None:
+            return
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+# -----------------------------
+# Config
+# -----------------------------
+def backend_from_config() -> Optional[Backend]:
+    """
+    Resolve the backend:
+    - SALESMONITOR_OFFLINE=1 or SALESMONITOR_DB=snapshot:///dir: local snapshots only, no network
+    - SALESMONITOR_DB=sqlite:///path/to.db or duckdb:///path/to.duckdb (local stand-ins)
+    - otherwise [snowflake] in .streamlit/secrets.toml (account/user/password/warehouse/database/schema/...)
+    - None when nothing is configured (app falls back to simulated data)
+    """
+    url = os.environ.get("SALESMONITOR_DB", "").strip()
+    if OFFLINE:
+        return SnapshotBackend(SNAPSHOT_DIR)
+    if url.startswith("snapshot:///"):
+        return SnapshotBackend(url[len("snapshot:///"):])
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url.startswith("duckdb:///"):
+        return DuckDBBackend(url[len("duckdb:///"):])
+
+    try:
+        sf = st.secrets.get("snowflake")
+    except Exception:
+        sf = None  # no secrets.toml
+    if sf:
+        return SnowflakeBackend(dict(sf))
+    return None
+
+
+@st.cache_resource
+def get_pool() -> Optional[ConnectionPool]:
+    backend = backend_from_config()
+    if backend is None:
+        return None
+    return ConnectionPool(backend, max_size=int(os.environ.get("SALESMONITOR_DB_POOL", "4")))
+
+
+@st.cache_resource
+def get_snapshot_pool() -> Optional[ConnectionPool]:
+    """Pool over SNAPSHOT_DIR for reads the configured backend could not answer; None without duckdb/pyarrow."""
+    if duckdb is None or pa is None:
+        return None
+    return ConnectionPool(SnapshotBackend(SNAPSHOT_DIR), max_size=int(os.environ.get("SALESMONITOR_DB_POOL", "4")))
@@ -0,0 +1,69 @@
+# demographics.py
+# Dense customer demographics for the "성별/연령대 분석" panel.
+# Notes:
+# - One int64 array [sub_channel, gender, age band, metric] with label indexes, filled from ONE cube roll-up
+#   per selection and cache generation.
+# - A channel-tree scope (회원 전체 / 온라인 / 자사몰 / 오프라인) is a boolean mask over the sub-channel axis; its
+#   figures are one vectorized sum, so switching scope or metric is a slice, never a dict walk.
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cube import MEASURES, SalesCube, load_cube
+from filters import SalesFilter
+
+GENDERS = ["male", "female"]
+GENDER_LABELS = {"male": "남성", "female": "여성"}
+AGE_LABELS = ["15-19", "20-24", "25-29", "30-34", "35-39", "40-44", "45-49", "50-54", "55-59", "60~"]
+
+
+class Demographics:
+    def __init__(self, cube: SalesCube):
+        frame = cube.rollup(("channel", "sub_channel", "gender", "age_band")).reset_index()
+        subs = pd.Categorical(frame["sub_channel"].astype(str))
+        self.sub_channels = np.asarray(subs.categories, dtype=object)
+        channel_of = dict(zip(frame["sub_channel"].astype(str), frame["channel"].astype(str)))
+        self.channels = np.asarray([channel_of[s] for s in self.sub_channels], dtype=object)
+
+        g = pd.Categorical(frame["gender"].astype(str), categories=GENDERS).codes
+        a = pd.Categorical(frame["age_band"].astype(str), categories=AGE_LABELS).codes
+        ok = (g >= 0) & (a >= 0)
+        self.values = np.zeros((len(self.sub_channels), len(GENDERS), len(AGE_LABELS), len(MEASURES)), dtype=np.int64)
+        for m, name in enumerate(MEASURES):
+            np.add.at(self.values, (subs.codes[ok], g[ok], a[ok], m), frame[name].to_numpy(dtype=np.int64)[ok])
+        self._memo: Dict[Tuple[Tuple[Tuple[str, str], ...], str], pd.DataFrame] = {}
+
+    def mask(self, channel: Optional[str] = None, sub_channel: Optional[str] = None) -> np.ndarray:
+        m = np.ones(len(self.sub_channels), dtype=bool)
+        if channel is not None:
+            m &= self.channels == channel
+        if sub_channel is not None:
+            m &= self.sub_channels == sub_channel
+        return m
+
+    def age_gender(self, metric: str = "sales", **scope: str) -> pd.DataFrame:
+        """연령대 x (남성, 여성) for a cube-style scope ({}, channel=..., sub_channel=...)."""
+        key = (tuple(sorted(scope.items())), metric)
+        hit = self._memo.get(key)
+        if hit is not None:
+            return hit
+        grid = self.values[self.mask(**scope), :, :, MEASURES.index(metric)].sum(axis=0)  # [gender, age]
+        out = pd.DataFrame(
+            grid.T,
+            index=pd.Index(AGE_LABELS, name="연령대"),
+            columns=[GENDER_LABELS[x] for x in GENDERS],
+        )
+        self._memo[key] = out
+        return out
+
+
+@st.cache_resource(ttl=600, max_entries=64)
+def load_demographics(flt: SalesFilter, gen: int = 0) -> Tuple[Demographics, Optional[str]]:
+    """(demographics array, error_message) over the selection's cube; rebuilt when its generation changes."""
+    cube, err = load_cube(flt, gen)
+    return Demographics(cube), err
@@ -0,0 +1,78 @@
+# downsample.py
+# Point-budgeted downsampling for charts (Largest-Triangle-Three-Buckets or min/max bucketing).
+# Notes:
+# - Frames are wide (x index, one column per series). Each series picks budget/k representative rows; the
+#   union of those rows is kept for every column, so all series share one x axis and the chart stays
+#   within about `budget` rows however many series it has.
+# - Frames at or under the budget pass through untouched (e.g. the 10-row age/gender bars).
+# - chart_frame() is cached on (frame content, budget, method), so reruns of an unchanged chart are hits.
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+CHART_POINTS = int(os.environ.get("SALESMONITOR_CHART_POINTS", "600"))  # rows (x positions) per chart
+
+
+def _x(index: pd.Index) -> np.ndarray:
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    if pd.api.types.is_numeric_dtype(index):
+        return index.to_numpy(dtype=np.float64)
+    return np.arange(len(index), dtype=np.float64)
+
+
+def minmax_indices(y: np.ndarray, budget: int) -> np.ndarray:
+    """Rows holding each bucket's min and max of every column (y: n x k); budget/2 equal buckets."""
+    n = y.shape[0]
+    buckets = max(1, budget // 2)
+    size = -(-n // buckets)  # ceil
+    padded = np.full((buckets * size, y.shape[1]), np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(buckets, size, -1)
+    valid = ~np.all(np.isnan(blocks), axis=1)  # (buckets, k): trailing buckets may be empty
+    offset = (np.arange(buckets) * size)[:, None]
+    filled = np.where(np.isnan(blocks), np.inf, blocks)
+    lo = np.argmin(filled, axis=1) + offset
+    hi = np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1) + offset
+    return np.unique(np.concatenate([lo[valid], hi[valid], [0, n - 1]]))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, budget: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets over one series; the area search inside each bucket is vectorized."""
+    n = len(y)
+    if budget >= n or budget < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.int64)  # budget-2 inner buckets
+    out = np.empty(budget, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(budget - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = hi, (edges[i + 2] if i + 2 < len(edges) else n)
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()  # next bucket's centroid
+        bx, by = x[lo:hi], y[lo:hi]
+        area = np.abs((x[a] - cx) * (by - y[a]) - (x[a] - bx) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def chart_frame(df: pd.DataFrame, budget: int = CHART_POINTS, method: str = "lttb") -> pd.DataFrame:
+    """`df` cut to at most about `budget` rows (method: "lttb" or "minmax"), keeping the chart's shape."""
+    n, k = df.shape
+    if n <= budget or k == 0:
+        return df
+    y = df.to_numpy(dtype=np.float64)
+    per_series = max(4, budget // k)
+    if method == "minmax":
+        keep = minmax_indices(y, per_series)
+    else:
+        x = _x(df.index)
+        keep = np.unique(np.concatenate([lttb_indices(x, y[:, j], per_series) for j in range(k)]))
+    return df.iloc[keep]
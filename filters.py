@@ -0,0 +1,70 @@
+# filters.py
+# The control-bar selection (brand, period, categories, style codes) as one immutable filter object.
+# Notes:
+# - Every per-selection loader (cube, trends, stores, regions, demographics, members) takes a SalesFilter,
+#   so the filters reach the data layer instead of stopping at the widgets.
+# - Warehouse: where() is the pushed-down predicate (brand + sale_date range for partition/cluster pruning,
+#   category/stylecode IN lists). Simulation: partitions() lists the (category, stylecode) partitions that
+#   match, and only those are generated; mask() filters frames that carry the columns.
+# - Frozen and normalized (sorted, de-duplicated codes), so it is a stable cache key: the same selection in a
+#   different click order hits the same cache entries.
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Any, List, Sequence, Tuple
+
+import pandas as pd
+
+from sample_data import product_partitions
+
+
+@dataclass(frozen=True)
+class SalesFilter:
+    brand: str
+    start: date
+    end: date
+    categories: Tuple[str, ...] = ()  # empty = every category
+    stylecodes: Tuple[str, ...] = ()  # empty = every style code
+
+    @classmethod
+    def of(
+        cls, brand: str, start: date, end: date, categories: Sequence[str] = (), stylecodes: Sequence[str] = ()
+    ) -> "SalesFilter":
+        return cls(brand, start, end, tuple(sorted(set(categories))), tuple(sorted(set(stylecodes))))
+
+    @property
+    def scope(self) -> Tuple[str, Tuple[str, ...], Tuple[str, ...]]:
+        """The filter without its period (brand, categories, stylecodes), for period-independent stores."""
+        return self.brand, self.categories, self.stylecodes
+
+    def between(self, start: date, end: date) -> "SalesFilter":
+        return replace(self, start=start, end=end)
+
+    def unfiltered(self) -> "SalesFilter":
+        """Same brand and period over every product (e.g. brand-wide member history)."""
+        return replace(self, categories=(), stylecodes=())
+
+    def where(self) -> Tuple[str, List[Any]]:
+        """(SQL predicate with ? placeholders, params) for the fact table."""
+        clauses = ["brand = ?", "sale_date BETWEEN ? AND ?"]
+        params: List[Any] = [self.brand, self.start.isoformat(), self.end.isoformat()]
+        for col, values in (("category", self.categories), ("stylecode", self.stylecodes)):
+            if values:
+                clauses.append(f"{col} IN ({', '.join(['?'] * len(values))})")
+                params.extend(values)
+        return " AND ".join(clauses), params
+
+    def partitions(self) -> List[Tuple[str, str]]:
+        """Simulated (category, stylecode) partitions this filter reads; the others are pruned."""
+        return product_partitions(self.categories, self.stylecodes)
+
+    def mask(self, df: pd.DataFrame) -> pd.Series:
+        """Rows of a frame with category/stylecode columns that pass the product filters."""
+        out = pd.Series(True, index=df.index)
+        if self.categories:
+            out &= df["category"].isin(self.categories)
+        if self.stylecodes:
+            out &= df["stylecode"].isin(self.stylecodes)
+        return out
@@ -0,0 +1,359 @@
+# kpi.py
+# Total Sales Amount KPI from stylecode-api (HTML-wrapped JSON).
+# Notes:
+# - Reads go through a stale-while-revalidate cache (swr.py): memory LRU + SQLite on disk, so an expired
+#   value is shown immediately while one background request refreshes it, and restarts start warm.
+# - Cache misses and refreshes go through the single-flight layer, so concurrent sessions share a request,
+#   and over one pooled keep-alive Session (with retries), so repeat calls skip the TLS handshake.
+# - submit_many()/fetch_many() look up many (brand, month) pairs in parallel on the bounded KPI executor.
+#   A pair whose cached value is fresh resolves on the spot, and a pair already being looked up shares the
+#   running future, so reruns never queue duplicate tasks behind slow requests. A failed lookup is answered
+#   from memory for KPI_ERROR_TTL_SECONDS, so the card's one rerun on completion does not retry it.
+# - Values keep the API's generated_at so the card can show data freshness.
+# - The page never waits on the API: submit_sales_amt() runs the lookup on a background executor and the
+#   card waits at most KPI_BUDGET_SECONDS (counted from submission), then falls back to the last cached value.
+# - Offline mode (db.OFFLINE) takes the month's sales from the local snapshots instead of the API. Online, a
+#   failed API request falls back to the snapshots too (the API's error is kept if they cannot answer), so
+#   an outage still serves a value for months the SWR cache never saw.
+
+from __future__ import annotations
+
+import calendar
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from db import OFFLINE, SNAPSHOT_DIR, ConnectionPool, get_pool, get_snapshot_pool
+from filters import SalesFilter
+from singleflight import get_flights
+from snapshot import read_through
+from swr import Entry, SWRCache
+from warehouse import load_sales_total_frame
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except Exception:
+    requests = None  # Streamlit Cloud may still have it; handle gracefully.
+
+API_URL = "https://stylecode-api-dpqrqczbz89gpmn2hnxx34.streamlit.app/"
+CACHE_DIR = os.environ.get("SALESMONITOR_CACHE_DIR", ".cache")
+KPI_TTL_SECONDS = 300
+KPI_ERROR_TTL_SECONDS = 30  # a failed lookup is answered from memory this long before it is retried
+KPI_BUDGET_SECONDS = float(os.environ.get("SALESMONITOR_KPI_BUDGET", "1.5"))
+KPI_PARALLELISM = int(os.environ.get("SALESMONITOR_KPI_PARALLELISM", "8"))
+
+Pair = Tuple[str, str]  # (brand, month)
+
+
+@dataclass(frozen=True)
+class KpiValue:
+    sales_amt: Optional[int]
+    generated_at: Optional[str] = None
+    error: Optional[str] = None
+    stale: bool = False  # served from an expired entry while a refresh runs
+    pending: bool = False  # no value yet; the lookup is still running
+
+
+@st.cache_resource
+def get_kpi_cache() -> SWRCache:
+    return SWRCache(os.path.join(CACHE_DIR, "kpi.sqlite"), ttl=KPI_TTL_SECONDS)
+
+
+@st.cache_resource
+def get_kpi_executor() -> ThreadPoolExecutor:
+    # Bounds concurrent stylecode-api requests for the whole process, batches included.
+    return ThreadPoolExecutor(max_workers=KPI_PARALLELISM, thread_name_prefix="kpi-fetch")
+
+
+@st.cache_resource
+def get_http_session():
+    """Shared keep-alive Session; None when requests is unavailable."""
+    if requests is None:
+        return None
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.3, status_forcelist=(429, 502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=KPI_PARALLELISM, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class InFlight:
+    """
+    Futures of the lookups still running, by cache key; asking again for a running key returns its future.
+    A lookup that ended in an error is kept for `error_ttl` seconds, so a rerun gets the error at once
+    instead of waiting on a new request to the same failing API.
+    """
+
+    def __init__(self, error_ttl: float = KPI_ERROR_TTL_SECONDS):
+        self.error_ttl = error_ttl
+        self._futures: Dict[str, Future] = {}
+        self._failed_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(not f.done() for f in self._futures.values())
+
+    def submit(self, executor: ThreadPoolExecutor, key: str, fn: Callable[..., Any], *args: Any) -> Future:
+        with self._lock:
+            fut = self._futures.get(key)
+            if fut is not None and (not fut.done() or time.monotonic() < self._failed_until.get(key, 0.0)):
+                return fut
+            self._failed_until.pop(key, None)
+            fut = self._futures[key] = executor.submit(fn, *args)
+        fut.add_done_callback(lambda f: self._settle(key, f))
+        return fut
+
+    def _settle(self, key: str, fut: Future) -> None:
+        failed = fut.exception() is not None or getattr(fut.result(), "error", None) is not None
+        with self._lock:
+            if self._futures.get(key) is not fut:
+                return
+            if failed:
+                self._failed_until[key] = time.monotonic() + self.error_ttl
+            else:
+                del self._futures[key]
+
+
+@st.cache_resource
+def get_kpi_in_flight() -> InFlight:
+    return InFlight()
+
+
+def _key(brand: str, month: str) -> str:
+    return f"sales_amt|{brand}|{month}"
+
+
+def _loader(brand: str, month: str) -> Callable[[], Dict[str, Any]]:
+    # cache_resource singletons (pools included) are resolved here, on the script thread, not in the worker.
+    flights, key = get_flights(), ("sales_amt", brand, month)
+    if OFFLINE:
+        pool = get_pool()
+        return lambda: flights.do(key, snapshot_sales_amt, brand, month, pool)
+    session, fallback = get_http_session(), get_snapshot_pool()
+    return lambda: flights.do(key, request_or_snapshot, brand, month, session, fallback)
+
+
+def _to_value(e: Entry, cache: SWRCache) -> KpiValue:
+    return KpiValue(e.value.get("sales_amt"), e.value.get("generated_at"), stale=cache.is_stale(e))
+
+
+def _fetch(cache: SWRCache, key: str, loader: Callable[[], Dict[str, Any]]) -> KpiValue:
+    running = cache.pending(key)
+    if running is not None:
+        running.result()  # a 조회하기 refresh is in flight: wait for it rather than serve the old value
+    try:
+        return _to_value(cache.get(key, loader), cache)
+    except Exception as e:
+        return KpiValue(None, error=str(e))
+
+
+def cached_sales_amt(brand: str, month: str) -> Optional[KpiValue]:
+    """Last stored KPI for (brand, month) without any request."""
+    cache = get_kpi_cache()
+    e = cache.peek(_key(brand, month))
+    return None if e is None else _to_value(e, cache)
+
+
+def refresh_sales_amt(brand: str, month: str) -> Future:
+    """
+    Re-fetch in the background (조회하기). Other sessions keep reading the previous value until the new one
+    is stored; lookups submitted meanwhile for this (brand, month) wait for the refresh instead.
+    """
+    cache = get_kpi_cache()
+    return cache.refresh(_key(brand, month), _loader(brand, month))
+
+
+@dataclass(frozen=True)
+class PendingKpi:
+    brand: str
+    month: str
+    future: Future
+    deadline: float  # time.monotonic() after which the card stops waiting
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self) -> KpiValue:
+        """The lookup result if it arrives within the budget, else the last cached value (or pending)."""
+        remaining = self.deadline - time.monotonic()
+        try:
+            return self.future.result(timeout=None if remaining == float("inf") else max(0.0, remaining))
+        except FutureTimeout:
+            last = cached_sales_amt(self.brand, self.month)
+            return replace(last, stale=True) if last is not None else KpiValue(None, pending=True)
+
+
+def _resolved(brand: str, month: str, value: KpiValue, deadline: float) -> PendingKpi:
+    fut: Future = Future()
+    fut.set_result(value)
+    return PendingKpi(brand, month, fut, deadline)
+
+
+def _submit(brand: str, month: str, deadline: float) -> PendingKpi:
+    if not brand:
+        return _resolved(brand, month, KpiValue(None, error="brand is empty"), deadline)
+    cache, key = get_kpi_cache(), _key(brand, month)
+    e = cache.peek(key)
+    if e is not None and not cache.is_stale(e) and cache.pending(key) is None:
+        return _resolved(brand, month, _to_value(e, cache), deadline)
+    fut = get_kpi_in_flight().submit(get_kpi_executor(), key, _fetch, cache, key, _loader(brand, month))
+    return PendingKpi(brand, month, fut, deadline)
+
+
+def submit_sales_amt(brand: str, month: str, budget: float = KPI_BUDGET_SECONDS) -> PendingKpi:
+    """Start the KPI lookup off the script thread; collect it later with .result()."""
+    return _submit(brand, month, time.monotonic() + budget)
+
+
+def submit_many(pairs: Iterable[Pair], budget: float = KPI_BUDGET_SECONDS) -> Dict[Pair, PendingKpi]:
+    """Start lookups for many (brand, month) pairs at once; they share one deadline."""
+    deadline = time.monotonic() + budget
+    return {p: _submit(p[0], p[1], deadline) for p in dict.fromkeys(pairs)}
+
+
+def fetch_many(pairs: Iterable[Pair], budget: Optional[float] = None) -> Dict[Pair, KpiValue]:
+    """
+    KPIs for many pairs in one parallel wave (e.g. every brand, or 12 months) instead of serial calls.
+    - budget: seconds to wait overall; pairs still running after it get their cached value (or pending)
+    """
+    pending = submit_many(pairs, float("inf") if budget is None else budget)
+    return {p: k.result() for p, k in pending.items()}
+
+
+# -----------------------------
+# Response parsing
+# -----------------------------
+SALES_KEY = "sales_amt"
+MAX_RESPONSE_BYTES = 2 * 1024 * 1024  # the payload is tiny; never buffer a whole runaway page
+MAX_OBJECT_SPAN = 64 * 1024  # how far before the anchor an enclosing "{" may start
+_DECODER = json.JSONDecoder()
+
+
+def extract_json_object(text: str, key: str = SALES_KEY, max_span: int = MAX_OBJECT_SPAN) -> Optional[Dict[str, Any]]:
+    """
+    The JSON object containing `"key"`, found without scanning the page with a regex.
+    - locate the anchor, walk left over braces to each unmatched "{" (innermost first), raw_decode from there
+    - braces inside JSON strings can throw that count off; then every "{" in the span is tried instead
+    - work is linear in the span inspected; returns None if no decodable object holds `key` at top level
+    """
+    anchor = f'"{key}"'
+    pos = text.find(anchor)
+    while pos != -1:
+        floor = max(0, pos - max_span)
+        obj = _enclosing_object(text, pos, floor, key, balanced=True)
+        if obj is None:
+            obj = _enclosing_object(text, pos, floor, key, balanced=False)
+        if obj is not None:
+            return obj
+        pos = text.find(anchor, pos + len(anchor))
+    return None
+
+
+def _enclosing_object(text: str, pos: int, floor: int, key: str, balanced: bool) -> Optional[Dict[str, Any]]:
+    """First object starting left of `pos` (down to `floor`) that decodes and holds `key`."""
+    depth = 0
+    i = pos
+    while True:
+        i = max(text.rfind("{", floor, i), text.rfind("}", floor, i)) if balanced else text.rfind("{", floor, i)
+        if i < 0:
+            return None
+        if text[i] == "}":
+            depth += 1
+        elif depth:
+            depth -= 1
+        else:
+            try:
+                obj, _ = _DECODER.raw_decode(text, i)
+            except ValueError:
+                obj = None
+            if isinstance(obj, dict) and key in obj:
+                return obj
+
+
+def _read_until_object(r, key: str = SALES_KEY, limit: int = MAX_RESPONSE_BYTES) -> Optional[Dict[str, Any]]:
+    """Stream the body and stop as soon as the object is complete (or `limit` bytes were read)."""
+    anchor = f'"{key}"'.encode()
+    buf = bytearray()
+    seen = False
+    for chunk in r.iter_content(chunk_size=64 * 1024):
+        start = max(0, len(buf) - len(anchor))
+        buf += chunk
+        seen = seen or buf.find(anchor, start) != -1
+        if seen:
+            data = extract_json_object(buf.decode(r.encoding or "utf-8", errors="replace"), key)
+            if data is not None:
+                return data
+        if len(buf) >= limit:
+            break
+    return None
+
+
+def request_sales_amt(brand: str, month: str, session=None) -> Dict[str, Any]:
+    """
+    Mimic the HTML behavior:
+    - call API_URL?brand=...&month=... (through `session` when given)
+    - response might be HTML; extract the JSON object holding sales_amt (streamed, capped at MAX_RESPONSE_BYTES)
+    - return {"sales_amt": int, "generated_at": str | None}; raise on any failure
+    """
+    if requests is None:
+        raise RuntimeError("requests not available")
+
+    url = f"{API_URL}?brand={brand}&month={month}"
+    with (session or requests).get(url, timeout=10, stream=True) as r:
+        if r.status_code != 200:
+            raise RuntimeError(f"HTTP {r.status_code}")
+        data = _read_until_object(r)
+
+    if not isinstance(data, dict) or "sales_amt" not in data:
+        raise ValueError("JSON parse failed / sales_amt missing")
+
+    sales_amt = data.get("sales_amt")
+    if not isinstance(sales_amt, (int, float)):
+        raise ValueError("sales_amt is not numeric")
+    generated_at = data.get("generated_at")
+    return {"sales_amt": int(sales_amt), "generated_at": str(generated_at) if generated_at is not None else None}
+
+
+def snapshot_sales_amt(brand: str, month: str, pool: Optional[ConnectionPool]) -> Dict[str, Any]:
+    """
+    Stand-in for request_sales_amt: the month's sales summed from the local snapshots behind `pool`.
+    - generated_at is the last complete snapshot day; raises when the snapshots cannot answer for the month
+    """
+    if pool is None:
+        raise RuntimeError("no snapshot store configured")
+    year, mon = (int(x) for x in month.split("-"))
+    first = date(year, mon, 1)
+    through = read_through(getattr(pool.backend, "root", SNAPSHOT_DIR), brand)
+    if through is None or through < first - timedelta(days=1):
+        raise RuntimeError(f"no snapshots of {brand} for {month}")
+    df = load_sales_total_frame(pool, SalesFilter(brand, first, date(year, mon, calendar.monthrange(year, mon)[1])))
+    total = df["sales"].iloc[0] if len(df) else None
+    if total is None or pd.isna(total):  # no stored rows: the month predates the store
+        raise RuntimeError(f"no snapshots of {brand} for {month}")
+    return {"sales_amt": int(total), "generated_at": through.isoformat()}
+
+
+def request_or_snapshot(brand: str, month: str, session=None, fallback: Optional[ConnectionPool] = None) -> Dict[str, Any]:
+    """request_sales_amt, answered from the snapshots behind `fallback` when the API fails; raises the API error."""
+    try:
+        return request_sales_amt(brand, month, session)
+    except Exception as api_error:
+        if fallback is not None:
+            try:
+                return snapshot_sales_amt(brand, month, fallback)
+            except Exception:
+                pass
+        raise api_error
@@ -0,0 +1,234 @@
+# members.py
+# Member first-purchase index for the "기존/신규 회원" split.
+# Notes:
+# - One index per brand: member ids as a sorted int64 array and their first purchase day (days since
+#   1970-01-01) as a parallel int32 array, stored as .npy files under CACHE_DIR/members and read memory-mapped.
+# - The index covers purchases up to `through` (yesterday at most). Each lookup first folds in only the days
+#   after `through` (one GROUP BY member_id over those days), so it is updated incrementally day by day.
+# - A period's members are classified with one searchsorted pass: 신규 when the first purchase falls inside the
+#   period (or after the indexed days), 기존 otherwise. Channel scopes are a mask and a bincount.
+# - Simulated orders are resampled to the simulated cube's sub-channel totals, so 회원 전체 matches the
+#   channel table; the first-purchase history still comes from the full simulated order stream.
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import zlib
+from datetime import date, timedelta
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cube import simulated_scope_totals
+from db import get_pool
+from filters import SalesFilter
+from sample_data import simulate_member_orders, split_amount
+from warehouse import FACT_TABLE, load_first_purchases, load_member_orders
+
+MEMBER_DIR = os.path.join(os.environ.get("SALESMONITOR_CACHE_DIR", ".cache"), "members")
+HISTORY_START = date.fromisoformat(os.environ.get("SALESMONITOR_MEMBER_HISTORY_START", "2018-01-01"))
+MEMBER_TYPES = ("기존회원", "신규회원")
+UNKNOWN_DAY = np.iinfo(np.int32).max  # first purchase of a member the index has not seen
+
+# (start, end) -> ((member ids, purchase days), error_message); ids/days may repeat a member
+HistoryLoader = Callable[[date, date], Tuple[Optional[Tuple[np.ndarray, np.ndarray]], Optional[str]]]
+
+
+def day_number(d: date) -> int:
+    return (d - date(1970, 1, 1)).days
+
+
+def to_days(values) -> np.ndarray:
+    return pd.to_datetime(values).to_numpy().astype("datetime64[D]").astype(np.int64)
+
+
+def first_by_member(ids: np.ndarray, days: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(unique ids ascending, earliest day of each) from purchase rows."""
+    order = np.lexsort((days, ids))
+    ids, days = ids[order], days[order]
+    head = np.ones(len(ids), dtype=bool)
+    head[1:] = ids[1:] != ids[:-1]
+    return ids[head], days[head]
+
+
+class MemberIndex:
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.through: Optional[date] = None
+        self.ids = np.empty(0, dtype=np.int64)
+        self.first = np.empty(0, dtype=np.int32)
+        self._lock = threading.Lock()
+        self._open()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _open(self) -> None:
+        """Map the stored arrays; a missing or torn index starts empty and is rebuilt from history."""
+        try:
+            with open(self._path("meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            ids = np.load(self._path("ids.npy"), mmap_mode="r")
+            first = np.load(self._path("first.npy"), mmap_mode="r")
+        except Exception:
+            return
+        if len(ids) != meta.get("count") or len(first) != len(ids):
+            return
+        self.ids, self.first, self.through = ids, first, date.fromisoformat(meta["through"])
+
+    def _save(self, ids: np.ndarray, first: np.ndarray, through: date) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        for name, arr in (("ids.npy", ids), ("first.npy", first)):
+            tmp = self._path(name + ".tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, arr)
+            os.replace(tmp, self._path(name))
+        # meta last: after a crash it still names the old `through`, and re-adding those days is harmless
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"through": through.isoformat(), "count": int(len(ids))}, f)
+        os.replace(tmp, self._path("meta.json"))
+        self._open()
+
+    def add(self, ids: np.ndarray, days: np.ndarray, through: date) -> None:
+        """Merge purchases (any order, repeats allowed) into the index, now complete up to `through`."""
+        new_ids, new_first = first_by_member(np.asarray(ids, dtype=np.int64), np.asarray(days, dtype=np.int64))
+        pos = np.searchsorted(self.ids, new_ids)
+        known = pos < len(self.ids)
+        known[known] = self.ids[pos[known]] == new_ids[known]
+        first = np.array(self.first, dtype=np.int32)  # in-memory copy of the mapped array
+        first[pos[known]] = np.minimum(first[pos[known]], new_first[known])
+        fresh = ~known
+        ids_all = np.insert(np.asarray(self.ids), pos[fresh], new_ids[fresh])
+        first_all = np.insert(first, pos[fresh], new_first[fresh].astype(np.int32))
+        self._save(ids_all, first_all, through)
+
+    def catch_up(self, through: date, load: HistoryLoader) -> Optional[str]:
+        """Fold in the days after `through` of the index up to `through`; returns an error message or None."""
+        with self._lock:
+            start = HISTORY_START if self.through is None else self.through + timedelta(days=1)
+            if start > through:
+                return None
+            rows, err = load(start, through)
+            if rows is None:
+                return err
+            self.add(*rows, through)
+            return None
+
+    def first_purchase(self, ids: np.ndarray) -> np.ndarray:
+        """First purchase day per id (days since 1970-01-01); UNKNOWN_DAY for ids not in the index."""
+        index_ids, first = self.ids, self.first
+        ids = np.asarray(ids, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(index_ids, ids), max(len(index_ids) - 1, 0))
+        out = np.full(len(ids), UNKNOWN_DAY, dtype=np.int64)
+        if len(index_ids):
+            hit = index_ids[pos] == ids
+            out[hit] = first[pos[hit]]
+        return out
+
+    def is_new(self, ids: np.ndarray, start: date) -> np.ndarray:
+        """True for members whose first purchase is on or after `start` (unseen members included)."""
+        return self.first_purchase(ids) >= day_number(start)
+
+
+class MemberSplit:
+    def __init__(self, orders: pd.DataFrame, is_new: np.ndarray):
+        """orders: [member_id, channel, sub_channel, qty, sales]; is_new: one flag per row."""
+        self.channel = orders["channel"].astype(str).to_numpy()
+        self.sub_channel = orders["sub_channel"].astype(str).to_numpy()
+        self.qty = pd.to_numeric(orders["qty"]).fillna(0).to_numpy(dtype=np.float64)
+        self.sales = pd.to_numeric(orders["sales"]).fillna(0).to_numpy(dtype=np.float64)
+        self.kind = is_new.astype(np.int64)
+
+    def table(self, channel: Optional[str] = None, sub_channel: Optional[str] = None) -> pd.DataFrame:
+        """qty/sales per member type (index 기존회원, 신규회원) for a cube-style scope."""
+        m = np.ones(len(self.kind), dtype=bool)
+        if channel is not None:
+            m &= self.channel == channel
+        if sub_channel is not None:
+            m &= self.sub_channel == sub_channel
+        kind = self.kind[m]
+        return pd.DataFrame(
+            {
+                "qty": np.bincount(kind, weights=self.qty[m], minlength=2).astype(np.int64),
+                "sales": np.bincount(kind, weights=self.sales[m], minlength=2).astype(np.int64),
+            },
+            index=pd.Index(MEMBER_TYPES, name="member_type"),
+        )
+
+
+def _simulated_orders(flt: SalesFilter) -> pd.DataFrame:
+    partitions = flt.partitions()
+    parts = [simulate_member_orders(flt.brand, year, partitions) for year in range(flt.start.year, flt.end.year + 1)]
+    df = pd.concat(parts, ignore_index=True)
+    return df[(df["sale_date"] >= np.datetime64(flt.start)) & (df["sale_date"] <= np.datetime64(flt.end))]
+
+
+def _scaled_to_cube(orders: pd.DataFrame, flt: SalesFilter) -> pd.DataFrame:
+    """
+    Unit rows resampled to the simulated cube's (channel, sub_channel) totals, so the split sums to the channel
+    table: each sub-channel keeps exactly the cube's units (drawn from its period buyers) and sales.
+    """
+    totals = simulated_scope_totals(flt)
+    rng = np.random.default_rng(zlib.crc32(repr(flt).encode("utf-8")))
+    by_scope = orders.groupby(["channel", "sub_channel"]).indices  # scope -> row positions
+    parts = []
+    for scope, row in totals.iterrows():
+        rows = by_scope.get(scope)
+        if rows is None or not len(rows) or row["qty"] <= 0:
+            continue
+        pick = orders.iloc[np.sort(rng.choice(rows, int(row["qty"]), replace=len(rows) < row["qty"]))]
+        price = pd.to_numeric(pick["sales"]).to_numpy(dtype=np.float64)
+        parts.append(pick.assign(qty=1, sales=split_amount(int(row["sales"]), np.where(price > 0, price, 1.0))))
+    return pd.concat(parts, ignore_index=True) if parts else orders.iloc[:0]
+
+
+def simulated_history(flt: SalesFilter) -> Tuple[Tuple[np.ndarray, np.ndarray], None]:
+    df = _simulated_orders(flt)
+    return (df["member_id"].to_numpy(), to_days(df["sale_date"])), None
+
+
+def warehouse_history(flt: SalesFilter) -> Tuple[Optional[Tuple[np.ndarray, np.ndarray]], Optional[str]]:
+    df, err = load_first_purchases(flt)
+    if df is None:
+        return None, err
+    return (pd.to_numeric(df["member_id"]).to_numpy(dtype=np.int64), to_days(df["first_date"])), None
+
+
+@st.cache_resource
+def get_member_index(brand: str, source: str) -> MemberIndex:
+    """Process-wide index per brand and data source ("simulated" or the fact table name)."""
+    return MemberIndex(os.path.join(MEMBER_DIR, source, brand))
+
+
+@st.cache_resource(ttl=600, max_entries=64)
+def load_member_split(flt: SalesFilter, gen: int = 0) -> Tuple[Optional[MemberSplit], Optional[str]]:
+    """
+    Returns (member split, error_message) for one selection.
+    - split is None when the warehouse could not answer (caller falls back to the cube's member_type)
+    """
+    simulated = get_pool() is None
+    if simulated:
+        orders = _scaled_to_cube(_simulated_orders(flt), flt)
+        orders = orders.groupby(["member_id", "channel", "sub_channel"], as_index=False, sort=False)[["qty", "sales"]].sum()
+        history = simulated_history
+    else:
+        orders, err = load_member_orders(flt)
+        if orders is None:
+            return None, err
+        history = warehouse_history
+    index = get_member_index(flt.brand, "simulated" if simulated else FACT_TABLE)
+    through = min(flt.end, date.today() - timedelta(days=1))
+    # first purchases are brand-wide: a member who bought any other product before is not new
+    err = index.catch_up(through, lambda s, e: history(flt.unfiltered().between(s, e)))
+    if err is not None:
+        return None, err
+    ids = pd.to_numeric(orders["member_id"]).to_numpy(dtype=np.int64)
+    return MemberSplit(orders, index.is_new(ids, flt.start)), None
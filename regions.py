@@ -0,0 +1,66 @@
+# regions.py
+# Region index for the "전국 지역별 매출 분포" panel.
+# Notes:
+# - Built once per selection and cache generation from ONE cube roll-up (channel, sub_channel, level):
+#   dense scope x region arrays of real qty and sales, with every scope's table (share, order) precomputed,
+#   so picking any offline channel is a dict read.
+# - `level` is any cube dimension. Finer geography (시/군/구) needs only its column in the fact table and in
+#   warehouse DIMENSIONS/PAGE_GROUPINGS; per-store figures come from stores.py.
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cube import DIM_LABELS, SalesCube, load_cube
+from filters import SalesFilter
+from warehouse import OFF_CHANNEL
+
+
+class RegionIndex:
+    def __init__(self, cube: SalesCube, channel: str = OFF_CHANNEL, level: str = "region"):
+        self.level = level
+        self.label = DIM_LABELS.get(level, level)
+        frame = cube.rollup(("channel", "sub_channel", level), channel=channel).reset_index()
+        subs = pd.Categorical(frame["sub_channel"].astype(str), categories=cube.members("sub_channel", channel=channel))
+        regions = pd.Categorical(frame[level].astype(str))
+        self.regions: List[str] = list(regions.categories)
+        self.scopes: List[str] = [f"{channel} 전체"] + list(subs.categories)
+
+        # dense [scope, region] arrays; scope 0 (channel total) is the vectorized sum of the sub-channels
+        shape = (len(self.scopes), len(self.regions))
+        self.qty = np.zeros(shape, dtype=np.int64)
+        self.sales = np.zeros(shape, dtype=np.int64)
+        ok = (subs.codes >= 0) & (regions.codes >= 0)
+        np.add.at(self.qty, (subs.codes[ok] + 1, regions.codes[ok]), frame["qty"].to_numpy(dtype=np.int64)[ok])
+        np.add.at(self.sales, (subs.codes[ok] + 1, regions.codes[ok]), frame["sales"].to_numpy(dtype=np.int64)[ok])
+        self.qty[0] = self.qty[1:].sum(axis=0)
+        self.sales[0] = self.sales[1:].sum(axis=0)
+
+        self._tables: Dict[str, pd.DataFrame] = {s: self._build(i) for i, s in enumerate(self.scopes)}
+
+    def _build(self, i: int) -> pd.DataFrame:
+        sales, qty = self.sales[i], self.qty[i]
+        total = sales.sum()
+        share = np.round(np.divide(sales * 100.0, total, out=np.zeros(len(sales)), where=total > 0), 1)
+        order = np.lexsort((np.asarray(self.regions, dtype=object), -sales))
+        return pd.DataFrame(
+            {self.label: np.asarray(self.regions, dtype=object)[order], "매출액": sales[order], "수량": qty[order], "비중(%)": share[order]}
+        )
+
+    def table(self, scope: str) -> pd.DataFrame:
+        """Region table for a channel-tree label ("오프라인 전체", "백화점", ...), sales desc; share = % of sales."""
+        hit = self._tables.get(scope)
+        if hit is None:
+            return self._tables[self.scopes[0]].iloc[:0]
+        return hit
+
+
+@st.cache_resource(ttl=600, max_entries=64)
+def load_region_index(flt: SalesFilter, gen: int = 0) -> Tuple[RegionIndex, Optional[str]]:
+    """(region index, error_message) over the selection's cube; rebuilt when its generation changes."""
+    cube, err = load_cube(flt, gen)
+    return RegionIndex(cube), err
@@ -0,0 +1,170 @@
+# rollup.py
+# Materialized daily / ISO-week / month rollups of the trend series, extended incrementally.
+# Notes:
+# - One entry per (brand, categories, stylecodes) selection holds a contiguous daily frame plus its weekly and
+#   monthly rollups. Asking for days outside the stored span loads ONLY the missing days and folds them into
+#   the affected buckets; nothing already stored is rescanned.
+# - Only closed days (up to `closed`, normally yesterday) are stored. The open tail (today and later) is still
+#   being written by the warehouse, so it is reloaded on every view older than TAIL_TTL_SECONDS and added on
+#   top of the stored buckets, never folded into them.
+# - A period is answered by slicing the stored grain; only its two edge buckets (which may hold days outside
+#   the period) are re-summed from the daily frame. Answers are memoized, so view toggles are dict hits.
+# - A new cache generation of the scope (조회하기) resets its entry; changing only the period keeps it.
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+GRAINS = ("daily", "weekly", "monthly")
+TAIL_TTL_SECONDS = float(os.environ.get("SALESMONITOR_TAIL_TTL", "60"))
+
+# (start, end) -> daily frame for exactly those days, or None when the days could not be loaded.
+DailyLoader = Callable[[date, date], Optional[pd.DataFrame]]
+
+
+def bucket_start(index: pd.DatetimeIndex, grain: str) -> pd.DatetimeIndex:
+    """First day of each day's bucket: the Monday of its ISO week, or the 1st of its month."""
+    if grain == "weekly":
+        return index - pd.to_timedelta(index.dayofweek, unit="D")
+    if grain == "monthly":
+        return index.to_period("M").to_timestamp()
+    return index
+
+
+def bucket_end(first: pd.Timestamp, grain: str) -> pd.Timestamp:
+    """Last day of the bucket starting at `first`."""
+    if grain == "weekly":
+        return first + pd.Timedelta(days=6)
+    return first + pd.offsets.MonthEnd(0)
+
+
+def rollup(daily: pd.DataFrame, grain: str) -> pd.DataFrame:
+    if grain == "daily":
+        return daily
+    return daily.groupby(bucket_start(daily.index, grain)).sum()
+
+
+def _union(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    """a + b aligned on index and columns (missing cells are 0), kept integer."""
+    return a.add(b, fill_value=0).fillna(0).astype(np.int64).sort_index()
+
+
+@dataclass
+class _Entry:
+    gen: int
+    daily: Optional[pd.DataFrame] = None
+    grains: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    # (grain, start, end, closed) -> (expiry on time.monotonic(), or None for closed periods; frame)
+    memo: Dict[Tuple[str, date, date, date], Tuple[Optional[float], pd.DataFrame]] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    @property
+    def span(self) -> Tuple[date, date]:
+        return self.daily.index[0].date(), self.daily.index[-1].date()
+
+    def add(self, new: pd.DataFrame) -> None:
+        """Fold days not yet stored into the daily frame and every coarser grain."""
+        if self.daily is None:
+            self.daily = new.sort_index()
+            self.grains = {g: rollup(self.daily, g) for g in GRAINS if g != "daily"}
+        else:
+            self.daily = _union(self.daily, new)
+            self.grains = {g: _union(self.grains[g], rollup(new, g)) for g in self.grains}
+        self.memo.clear()
+
+
+class RollupStore:
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, key: Hashable, gen: int) -> _Entry:
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None or e.gen != gen:
+                e = self._entries[key] = _Entry(gen)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return e
+
+    def view(
+        self,
+        key: Hashable,
+        gen: int,
+        start: date,
+        end: date,
+        grain: str,
+        load: DailyLoader,
+        closed: Optional[date] = None,
+        tail_ttl: float = TAIL_TTL_SECONDS,
+    ) -> Optional[pd.DataFrame]:
+        """
+        `grain` frame for [start, end] (DatetimeIndex of bucket starts), or None if days could not be loaded.
+        - load(s, e) is called only for the closed days in [start, end] not stored yet, plus the open tail
+        - closed: last day whose data is final (default `end`); later days are never stored
+        - tail_ttl: seconds a view including open days is reused before the tail is reloaded
+        """
+        closed = end if closed is None else closed
+        memo_key = (grain, start, end, closed)
+        e = self._entry(key, gen)
+        with e.lock:
+            hit = e.memo.get(memo_key)
+            if hit is not None and (hit[0] is None or time.monotonic() < hit[0]):
+                return hit[1]
+            out: Optional[pd.DataFrame] = None
+            stored_end = min(end, closed)
+            if start <= stored_end:
+                if not self._cover(e, start, stored_end, load):
+                    return None
+                out = self._slice(e, start, stored_end, grain)
+            expires: Optional[float] = None
+            tail_start = max(start, closed + timedelta(days=1))
+            if tail_start <= end:
+                tail = load(tail_start, end)
+                if tail is None:
+                    return None
+                # a bucket straddling `closed` gets its stored days plus the open ones
+                out = rollup(tail, grain) if out is None else _union(out, rollup(tail, grain))
+                expires = time.monotonic() + tail_ttl
+            e.memo[memo_key] = (expires, out)
+            return out
+
+    @staticmethod
+    def _cover(e: _Entry, start: date, end: date, load: DailyLoader) -> bool:
+        if e.daily is None:
+            missing = [(start, end)]
+        else:
+            lo, hi = e.span
+            # keep the stored span contiguous: a far-off period also loads the gap
+            missing = [(start, lo - timedelta(days=1))] if start < lo else []
+            if end > hi:
+                missing.append((hi + timedelta(days=1), end))
+        for s, t in missing:
+            new = load(s, t)
+            if new is None:
+                return False
+            e.add(new)
+        return True
+
+    @staticmethod
+    def _slice(e: _Entry, start: date, end: date, grain: str) -> pd.DataFrame:
+        days = e.daily.loc[pd.Timestamp(start): pd.Timestamp(end)]
+        if grain == "daily" or days.empty:
+            return rollup(days, grain)
+        first, last = bucket_start(days.index[[0, -1]], grain)
+        out = e.grains[grain].loc[first:last].copy()
+        # edge buckets may also hold stored days outside the period: re-sum those two from the daily slice
+        out.loc[first] = days.loc[: bucket_end(first, grain)].sum()
+        out.loc[last] = days.loc[last:].sum()
+        return out
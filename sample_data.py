@@ -0,0 +1,386 @@
+# sample_data.py
+# Simulated data used when no warehouse is configured.
+# Notes:
+# - DATA is the nested structure ported from index.html; it is only the *seed* for simulate_facts().
+# - simulate_facts() expands it into one fact row per sold unit, so every marginal the HTML showed
+#   (channel qty/sales, colors, sizes, geo) is reproduced exactly and totals are derived, not duplicated.
+# - Products are PRODUCT_MIX (category, stylecode) partitions, each a fixed share of every channel. Facts carry
+#   the two columns; the daily series are generated per partition (own seed), so a selection sums only the
+#   partitions it matches and the rest are never generated.
+# - simulate_daily() gives one calendar year of daily qty/sales per sub-channel at the same monthly level
+#   (weekday + yearly seasonality + noise); each year has its own seed, so a day's value never depends on
+#   which period is being viewed.
+# - simulate_store_daily() deals the offline sub-channels' daily units over STORE_COUNTS stores as whole units
+#   (long-tailed store sizes, multinomial draws), for the store ranking; sales follow units x unit price.
+# - simulate_member_orders() turns the daily series into member-level orders (a member base that grows over
+#   time, older members buying more often), for the new/existing member split.
+
+from __future__ import annotations
+
+import zlib
+from functools import reduce
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# Simulated DATA (ported conceptually from index.html)
+# -----------------------------
+# Minimal faithful translation of the JS DATA structure.
+DATA: Dict[str, Any] = {
+    "total": {
+        "전체": {
+            "qty": 6300,
+            "sales": 772_100_000,
+            "colors": {"BLACK": 3300, "WHITE": 1400, "GREY": 600, "BEIGE": 600, "NAVY": 400},
+            "sizes": {"230": 400, "240": 900, "250": 2000, "260": 2000, "270": 1000},
+        },
+        "온라인": {
+            "qty": 3500,
+            "sales": 452_100_000,
+            "colors": {"BLACK": 1500, "WHITE": 1000, "GREY": 600, "NAVY": 400},
+            "sizes": {"230": 400, "240": 900, "250": 1200, "260": 700, "270": 300},
+        },
+        "오프라인": {
+            "qty": 2800,
+            "sales": 320_000_000,
+            "colors": {"BLACK": 1800, "BEIGE": 600, "WHITE": 400},
+            "sizes": {"250": 800, "260": 1000, "270": 1000},
+        },
+    },
+    "on": {
+        "온라인 전체": {
+            "qty": 3500,
+            "colors": {"BLACK": 1500, "WHITE": 1000, "GREY": 600, "NAVY": 400},
+            "sizes": {"230": 400, "240": 900, "250": 1200, "260": 700, "270": 300},
+        },
+        "자사몰": {"qty": 1050, "colors": {"BLACK": 450, "WHITE": 350, "GREY": 150, "NAVY": 100}, "sizes": {"230": 100, "240": 300, "250": 350, "260": 200, "270": 100}},
+        "무신사": {"qty": 875, "colors": {"BLACK": 400, "WHITE": 200, "GREY": 175, "NAVY": 100}, "sizes": {"240": 275, "250": 300, "260": 200, "270": 100}},
+        "네이버 스토어": {"qty": 700, "colors": {"BLACK": 300, "WHITE": 250, "GREY": 100, "NAVY": 50}, "sizes": {"230": 150, "240": 250, "250": 200, "260": 100}},
+        "29CM": {"qty": 525, "colors": {"BLACK": 200, "WHITE": 150, "GREY": 100, "NAVY": 75}, "sizes": {"230": 100, "240": 200, "250": 150, "260": 75}},
+        "W컨셉": {"qty": 350, "colors": {"BLACK": 150, "WHITE": 50, "GREY": 75, "NAVY": 75}, "sizes": {"230": 50, "240": 100, "250": 150, "260": 50}},
+    },
+    "off": {
+        "오프라인 전체": {"qty": 2800, "colors": {"BLACK": 1800, "BEIGE": 600, "WHITE": 400}, "sizes": {"250": 800, "260": 1000, "270": 1000}, "geo": {"서울": 1200, "경기": 800, "부산": 300, "대구": 200, "광주": 100, "대전": 100, "제주": 100}},
+        "백화점": {"qty": 1960, "colors": {"BLACK": 1300, "BEIGE": 400, "WHITE": 260}, "sizes": {"250": 500, "260": 700, "270": 760}, "geo": {"서울": 1000, "경기": 500, "부산": 200, "대구": 100, "기타": 160}},
+        "대리점": {"qty": 560, "colors": {"BLACK": 300, "BEIGE": 160, "WHITE": 100}, "sizes": {"250": 200, "260": 200, "270": 160}, "geo": {"서울": 100, "경기": 200, "부산": 100, "대구": 100, "광주": 60}},
+        "직영점": {"qty": 280, "colors": {"BLACK": 200, "BEIGE": 40, "WHITE": 40}, "sizes": {"250": 100, "260": 100, "270": 80}, "geo": {"서울": 100, "경기": 100, "부산": 80}},
+    },
+    "cust": {
+        "회원 전체": {
+            "qty": 6300,
+            "sales": 772_100_000,
+            "colors": {"BLACK": 3000, "WHITE": 2000, "GREY": 1300},
+            "sizes": {"240": 1500, "250": 2500, "260": 2300},
+            "members": {"기존회원": {"qty": 4410, "sales": 540_470_000}, "신규회원": {"qty": 1890, "sales": 231_630_000}},
+            "ageGender": {
+                "male": {
+                    "15-19": {"qty": 180, "sales": 22_000_000}, "20-24": {"qty": 520, "sales": 64_000_000}, "25-29": {"qty": 850, "sales": 104_000_000},
+                    "30-34": {"qty": 920, "sales": 112_000_000}, "35-39": {"qty": 680, "sales": 83_000_000}, "40-44": {"qty": 450, "sales": 55_000_000},
+                    "45-49": {"qty": 320, "sales": 39_000_000}, "50-54": {"qty": 220, "sales": 27_000_000}, "55-59": {"qty": 150, "sales": 18_000_000}, "60~": {"qty": 120, "sales": 15_000_000},
+                },
+                "female": {
+                    "15-19": {"qty": 200, "sales": 24_000_000}, "20-24": {"qty": 680, "sales": 83_000_000}, "25-29": {"qty": 950, "sales": 116_000_000},
+                    "30-34": {"qty": 780, "sales": 95_000_000}, "35-39": {"qty": 520, "sales": 64_000_000}, "40-44": {"qty": 380, "sales": 46_000_000},
+                    "45-49": {"qty": 280, "sales": 34_000_000}, "50-54": {"qty": 200, "sales": 24_000_000}, "55-59": {"qty": 130, "sales": 16_000_000}, "60~": {"qty": 100, "sales": 12_000_000},
+                },
+            },
+        },
+        # HTML은 온라인/자사몰을 동일 데이터로 두었으므로 그대로 유지
+        "온라인": {
+            "qty": 3500, "sales": 452_100_000,
+            "colors": {"BLACK": 1500, "WHITE": 1200, "GREY": 800},
+            "sizes": {"240": 1000, "250": 1500, "260": 1000},
+            "members": {"기존회원": {"qty": 2450, "sales": 316_470_000}, "신규회원": {"qty": 1050, "sales": 135_630_000}},
+            "ageGender": {
+                "male": {"15-19": {"qty": 100, "sales": 12_000_000}, "20-24": {"qty": 290, "sales": 36_000_000}, "25-29": {"qty": 470, "sales": 58_000_000}, "30-34": {"qty": 510, "sales": 62_000_000},
+                         "35-39": {"qty": 380, "sales": 46_000_000}, "40-44": {"qty": 250, "sales": 30_000_000}, "45-49": {"qty": 180, "sales": 22_000_000}, "50-54": {"qty": 120, "sales": 15_000_000},
+                         "55-59": {"qty": 80, "sales": 10_000_000}, "60~": {"qty": 70, "sales": 8_000_000}},
+                "female": {"15-19": {"qty": 110, "sales": 13_000_000}, "20-24": {"qty": 380, "sales": 46_000_000}, "25-29": {"qty": 530, "sales": 65_000_000}, "30-34": {"qty": 430, "sales": 52_000_000},
+                           "35-39": {"qty": 290, "sales": 35_000_000}, "40-44": {"qty": 210, "sales": 25_000_000}, "45-49": {"qty": 150, "sales": 18_000_000}, "50-54": {"qty": 110, "sales": 13_000_000},
+                           "55-59": {"qty": 70, "sales": 8_000_000}, "60~": {"qty": 60, "sales": 7_000_000}},
+            },
+        },
+        "자사몰": None,  # will be set to 온라인 as alias
+        "오프라인": {
+            "qty": 2800, "sales": 320_000_000,
+            "colors": {"BLACK": 1500, "BEIGE": 800, "WHITE": 500},
+            "sizes": {"250": 1000, "260": 1300, "270": 500},
+            "members": {"기존회원": {"qty": 1960, "sales": 224_000_000}, "신규회원": {"qty": 840, "sales": 96_000_000}},
+            "ageGender": {
+                "male": {"15-19": {"qty": 80, "sales": 10_000_000}, "20-24": {"qty": 230, "sales": 28_000_000}, "25-29": {"qty": 380, "sales": 46_000_000}, "30-34": {"qty": 410, "sales": 50_000_000},
+                         "35-39": {"qty": 300, "sales": 37_000_000}, "40-44": {"qty": 200, "sales": 25_000_000}, "45-49": {"qty": 140, "sales": 17_000_000}, "50-54": {"qty": 100, "sales": 12_000_000},
+                         "55-59": {"qty": 70, "sales": 8_000_000}, "60~": {"qty": 50, "sales": 6_000_000}},
+                "female": {"15-19": {"qty": 90, "sales": 11_000_000}, "20-24": {"qty": 300, "sales": 37_000_000}, "25-29": {"qty": 420, "sales": 51_000_000}, "30-34": {"qty": 350, "sales": 43_000_000},
+                           "35-39": {"qty": 230, "sales": 29_000_000}, "40-44": {"qty": 170, "sales": 21_000_000}, "45-49": {"qty": 130, "sales": 16_000_000}, "50-54": {"qty": 90, "sales": 11_000_000},
+                           "55-59": {"qty": 60, "sales": 8_000_000}, "60~": {"qty": 40, "sales": 5_000_000}},
+            },
+        },
+        "백화점": None,  # optional: you can expand similarly if needed
+        "대리점": None,
+        "직영점": None,
+    },
+}
+DATA["cust"]["자사몰"] = DATA["cust"]["온라인"]
+
+# Sub-channel share of the channel's sales (the HTML only lists qty for sub-channels).
+SUB_CHANNEL_SALES_SHARE: Dict[str, float] = {
+    "자사몰": 0.30,
+    "무신사": 0.25,
+    "네이버 스토어": 0.20,
+    "29CM": 0.15,
+    "W컨셉": 0.10,
+    "백화점": 0.70,
+    "대리점": 0.20,
+    "직영점": 0.10,
+}
+
+# Simulated catalog: (category, stylecode) -> share of every channel's volume (sums to 1).
+PRODUCT_MIX: Dict[Tuple[str, str], float] = {
+    ("shoes", "SC-001"): 0.14,
+    ("shoes", "SC-002"): 0.10,
+    ("shoes", "SC-003"): 0.07,
+    ("shoes", "SC-004"): 0.05,
+    ("shoes", "SC-005"): 0.04,
+    ("top", "TP-101"): 0.12,
+    ("top", "TP-102"): 0.08,
+    ("bottom", "BT-201"): 0.10,
+    ("bottom", "BT-202"): 0.07,
+    ("acc", "AC-301"): 0.13,
+    ("acc", "AC-302"): 0.10,
+}
+
+
+# Display names of the simulated style codes (real catalogs come from data/catalog, see catalog.py).
+STYLE_NAMES: Dict[str, str] = {
+    "SC-001": "SC-AIR-01",
+    "SC-002": "SC-RUN-05",
+    "SC-003": "SC-CT-09",
+    "SC-004": "SC-LIFESTYLE-X",
+    "SC-005": "SC-PRO-CHAMP",
+    "TP-101": "TP-LOGO-TEE",
+    "TP-102": "TP-HOODIE-02",
+    "BT-201": "BT-JOGGER-01",
+    "BT-202": "BT-DENIM-03",
+    "AC-301": "AC-CAP-01",
+    "AC-302": "AC-BAG-05",
+}
+
+
+def simulated_catalog() -> pd.DataFrame:
+    """[stylecode, category, style_name], one row per PRODUCT_MIX style code."""
+    return pd.DataFrame(
+        [(s, c, STYLE_NAMES.get(s, s)) for c, s in PRODUCT_MIX], columns=["stylecode", "category", "style_name"]
+    )
+
+
+def product_partitions(categories: Sequence[str] = (), stylecodes: Sequence[str] = ()) -> List[Tuple[str, str]]:
+    """PRODUCT_MIX partitions matching the filters (an empty filter matches everything)."""
+    return [
+        (c, s) for c, s in PRODUCT_MIX
+        if (not categories or c in categories) and (not stylecodes or s in stylecodes)
+    ]
+
+
+def _partition_seed(seed: str, partition: Tuple[str, str]) -> str:
+    return f"{seed}|{partition[0]}|{partition[1]}"
+
+
+def _spread(labels: Sequence[Any], weights: Sequence[float], n: int, rng: np.random.Generator) -> np.ndarray:
+    """n labels in proportion to weights (largest remainder, so counts are exact when weights sum to n), shuffled."""
+    w = np.asarray(weights, dtype=float)
+    raw = w / w.sum() * n
+    cnt = np.floor(raw).astype(np.int64)
+    rem = n - int(cnt.sum())
+    if rem > 0:
+        cnt[np.argsort(cnt - raw)[:rem]] += 1
+    out = np.repeat(np.asarray(labels, dtype=object), cnt)
+    rng.shuffle(out)
+    return out
+
+
+def _unit_sales(total: int, n: int) -> np.ndarray:
+    # integer split of `total` over n units that sums back exactly
+    out = np.full(n, total // n, dtype=np.int64)
+    out[: total % n] += 1
+    return out
+
+
+def allocate_units(total: int, weights: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """`total` whole units drawn over `weights` (multinomial): small shares get 0 or 1 units, never fractions."""
+    w = np.asarray(weights, dtype=float)
+    if total <= 0 or len(w) == 0:
+        return np.zeros(len(w), dtype=np.int64)
+    w = w if w.sum() > 0 else np.ones(len(w))
+    return rng.multinomial(total, w / w.sum()).astype(np.int64)
+
+
+def split_amount(total: int, weights: np.ndarray) -> np.ndarray:
+    """Integer split of `total` in proportion to `weights` that sums back exactly (largest remainder)."""
+    w = np.asarray(weights, dtype=float)
+    if len(w) == 0 or w.sum() <= 0:
+        return np.zeros(len(w), dtype=np.int64)
+    raw = w / w.sum() * total
+    out = np.floor(raw).astype(np.int64)
+    out[np.argsort(out - raw)[: total - int(out.sum())]] += 1
+    return out
+
+
+def simulate_facts(seed: str = "") -> pd.DataFrame:
+    """
+    One row per sold unit: channel, sub_channel, category, stylecode, color, size, region, gender, age_band,
+    member_type, qty, sales.
+    """
+    rng = np.random.default_rng(zlib.crc32(seed.encode("utf-8")))
+    parts: List[pd.DataFrame] = []
+    for section, channel in (("on", "온라인"), ("off", "오프라인")):
+        channel_sales = DATA["total"][channel]["sales"]
+        cust = DATA["cust"][channel]
+        demo = [(g, a, v["qty"]) for g, by_age in cust["ageGender"].items() for a, v in by_age.items()]
+        for sub, d in DATA[section].items():
+            if sub.endswith("전체"):
+                continue
+            n = int(d["qty"])
+            geo = d.get("geo")
+            gender_age = _spread([f"{g}|{a}" for g, a, _ in demo], [w for _, _, w in demo], n, rng)
+            product = _spread([f"{c}|{s}" for c, s in PRODUCT_MIX], list(PRODUCT_MIX.values()), n, rng)
+            parts.append(
+                pd.DataFrame(
+                    {
+                        "channel": channel,
+                        "sub_channel": sub,
+                        "category": [x.split("|")[0] for x in product],
+                        "stylecode": [x.split("|")[1] for x in product],
+                        "color": _spread(list(d["colors"]), list(d["colors"].values()), n, rng),
+                        "size": _spread(list(d["sizes"]), list(d["sizes"].values()), n, rng),
+                        "region": _spread(list(geo), list(geo.values()), n, rng) if geo else None,
+                        "gender": [x.split("|")[0] for x in gender_age],
+                        "age_band": [x.split("|")[1] for x in gender_age],
+                        "member_type": _spread(list(cust["members"]), [v["qty"] for v in cust["members"].values()], n, rng),
+                        "qty": 1,
+                        "sales": _unit_sales(int(channel_sales * SUB_CHANNEL_SALES_SHARE[sub]), n),
+                    }
+                )
+            )
+    return pd.concat(parts, ignore_index=True)
+
+
+# Relative daily volume Mon..Sun, and the yearly peak (day of year) for the daily simulation.
+WEEKDAY_FACTOR = np.array([0.90, 0.85, 0.90, 0.95, 1.05, 1.25, 1.10])
+SEASON_PEAK_DAY = 330
+
+
+def simulate_daily(seed: str, year: int, scale: float = 1.0) -> pd.DataFrame:
+    """
+    Daily qty/sales for every sub-channel over one calendar year.
+    - index: DatetimeIndex (each day of `year`); columns: MultiIndex (metric, channel, sub_channel)
+    - a sub-channel's DATA qty is treated as a 30-day volume (times `scale`); its price comes from
+      SUB_CHANNEL_SALES_SHARE
+    """
+    rng = np.random.default_rng(zlib.crc32(f"{seed}|{year}".encode("utf-8")))
+    dates = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+    cols, base, price = [], [], []
+    for section, channel in (("on", "온라인"), ("off", "오프라인")):
+        channel_sales = DATA["total"][channel]["sales"]
+        for sub, d in DATA[section].items():
+            if sub.endswith("전체"):
+                continue
+            cols.append((channel, sub))
+            base.append(d["qty"] * scale / 30.0)
+            price.append(channel_sales * SUB_CHANNEL_SALES_SHARE[sub] / d["qty"])
+
+    n, k = len(dates), len(cols)
+    season = 1.0 + 0.15 * np.cos(2 * np.pi * (dates.dayofyear.to_numpy() - SEASON_PEAK_DAY) / 365.25)
+    level = np.asarray(base)[None, :] * (WEEKDAY_FACTOR[dates.dayofweek.to_numpy()] * season)[:, None]
+    qty = rng.poisson(level * rng.lognormal(0.0, 0.12, (n, k)))
+    sales = np.round(qty * np.asarray(price)[None, :] * rng.normal(1.0, 0.03, (n, k))).astype(np.int64)
+
+    columns = pd.MultiIndex.from_tuples(
+        [(m, c, s) for m in ("qty", "sales") for c, s in cols], names=["metric", "channel", "sub_channel"]
+    )
+    return pd.DataFrame(np.hstack([qty, sales]), index=dates, columns=columns)
+
+
+def simulate_partition_daily(seed: str, year: int, partitions: Sequence[Tuple[str, str]]) -> pd.DataFrame:
+    """simulate_daily() summed over the given product partitions only (all zeros for none)."""
+    frames = [simulate_daily(_partition_seed(seed, p), year, PRODUCT_MIX[p]) for p in partitions]
+    return reduce(pd.DataFrame.add, frames) if frames else simulate_daily(seed, year, 0.0)
+
+
+# Stores per offline sub-channel in the simulation (real data has one store_name per shop).
+STORE_COUNTS: Dict[str, int] = {"백화점": 320, "대리점": 1450, "직영점": 180}
+
+
+def store_names(sub_channel: str) -> List[str]:
+    return [f"{sub_channel} {i:04d}호점" for i in range(1, STORE_COUNTS[sub_channel] + 1)]
+
+
+def simulate_store_daily(seed: str, year: int, daily: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    sub_channel -> daily qty/sales per store over one calendar year.
+    - index: DatetimeIndex; columns: MultiIndex (metric, store_name)
+    - each day's sub-channel units (`daily`, a simulate_daily() frame of `year`) are dealt out as whole units
+      by the brand's fixed long-tailed store weights + noise; sales are units x the day's unit price
+    """
+    rng = np.random.default_rng(zlib.crc32(f"{seed}|{year}|stores".encode("utf-8")))
+    out: Dict[str, pd.DataFrame] = {}
+    for sub, n in STORE_COUNTS.items():
+        weights = rng.pareto(1.5, n) + 1.0
+        weights /= weights.sum()
+        share = weights[None, :] * rng.lognormal(0.0, 0.25, (len(daily), n))
+        share /= share.sum(axis=1, keepdims=True)
+        day_qty = daily[("qty", "오프라인", sub)].to_numpy().astype(np.int64)
+        day_sales = daily[("sales", "오프라인", sub)].to_numpy().astype(np.float64)
+        qty = rng.multinomial(day_qty, share).astype(np.int64)
+        price = np.divide(day_sales, day_qty, out=np.zeros(len(day_qty)), where=day_qty > 0)
+        sales = np.round(qty * price[:, None]).astype(np.int64)
+        names = store_names(sub)
+        columns = pd.MultiIndex.from_tuples([(m, s) for m in ("qty", "sales") for s in names], names=["metric", "store_name"])
+        out[sub] = pd.DataFrame(np.hstack([qty, sales]), index=daily.index, columns=columns)
+    return out
+
+
+# Simulated member base: members who exist on day d (days since MEMBER_EPOCH) are ids 0 .. size(d) - 1.
+MEMBER_EPOCH = "2018-01-01"
+MEMBER_BASE = 20_000
+MEMBERS_PER_DAY = 40
+
+
+def simulate_member_orders(seed: str, year: int, partitions: Sequence[Tuple[str, str]]) -> pd.DataFrame:
+    """
+    One row per sold unit of `year` in the given product partitions:
+    [member_id, sale_date, channel, sub_channel, qty, sales].
+    - units and sales per (day, sub-channel) are those of each partition's simulate_daily(); sale_date is datetime64[D]
+    """
+    parts = [_member_orders(_partition_seed(seed, p), year, PRODUCT_MIX[p]) for p in partitions]
+    return pd.concat(parts, ignore_index=True) if parts else _member_orders(seed, year, 0.0)
+
+
+def _member_orders(seed: str, year: int, scale: float) -> pd.DataFrame:
+    daily = simulate_daily(seed, year, scale)
+    rng = np.random.default_rng(zlib.crc32(f"{seed}|{year}|members".encode("utf-8")))
+    qty = daily["qty"].to_numpy()
+    sales = daily["sales"].to_numpy()
+    cells = qty.ravel()  # (day, sub-channel) cells, row-major
+    day_idx = np.repeat(np.arange(qty.shape[0]), qty.shape[1])
+    col_idx = np.tile(np.arange(qty.shape[1]), qty.shape[0])
+    units_day = np.repeat(day_idx, cells)
+    units_col = np.repeat(col_idx, cells)
+    unit_price = np.divide(sales.ravel(), cells, out=np.zeros(len(cells)), where=cells > 0)
+
+    dates = daily.index.to_numpy().astype("datetime64[D]")[units_day]
+    size = MEMBER_BASE + MEMBERS_PER_DAY * (dates - np.datetime64(MEMBER_EPOCH, "D")).astype(np.int64)
+    # u**0.7 leans toward recent ids so each member's first purchase lands near when they joined
+    member_id = np.minimum((size * rng.random(len(dates)) ** 0.7).astype(np.int64), size - 1)
+    subs = daily["qty"].columns
+    return pd.DataFrame(
+        {
+            "member_id": member_id,
+            "sale_date": dates,
+            "channel": subs.get_level_values("channel").to_numpy()[units_col],
+            "sub_channel": subs.get_level_values("sub_channel").to_numpy()[units_col],
+            "qty": 1,
+            "sales": np.round(np.repeat(unit_price, cells)).astype(np.int64),
+        }
+    )
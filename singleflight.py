@@ -0,0 +1,74 @@
+# singleflight.py
+# In-process request coalescing ("single flight").
+# Notes:
+# - Concurrent callers for the same key share ONE in-flight call and receive its result (or its exception).
+# - Used for the stylecode-api KPI: when the cache TTL expires, every open session asking for the same
+#   (brand, month) would otherwise fire its own 10 s request.
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import streamlit as st
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._calls_total = 0
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            self._calls_total += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executions += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def metrics(self) -> Dict[str, int]:
+        """calls = callers seen, executions = real calls made, coalesced = callers that shared one."""
+        with self._lock:
+            return {
+                "calls": self._calls_total,
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+@st.cache_resource
+def get_flights() -> SingleFlight:
+    return SingleFlight()
@@ -0,0 +1,126 @@
+# snapshot.py
+# Local snapshot store: each day's aggregated sales facts as an Arrow IPC file, partitioned brand/month/day.
+# Notes:
+# - Layout under SNAPSHOT_DIR: brand=<b>/month=<YYYY-MM>/sale_date=<YYYY-MM-DD>/part.arrow, one uncompressed
+#   IPC file per day (rows = load_snapshot_frame, i.e. facts summed per day and every dimension except
+#   member_id). Files are replaced atomically, so readers never see a half-written day.
+# - Reads go through db.SnapshotBackend: the files are one memory-mapped pyarrow dataset inside DuckDB, so a
+#   cold start pages in the partitions a query touches instead of re-running warehouse queries.
+# - sync_snapshots() writes the days after each brand's manifest (`through`, the last complete day) up to
+#   today; today is partial and rewritten on every sync. It runs from the warm-up pass when
+#   SALESMONITOR_SNAPSHOT_SYNC=1, or as `python snapshot.py` (e.g. from cron).
+# - Offline mode (SALESMONITOR_OFFLINE=1) serves the whole dashboard from these files, KPI included.
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import date, timedelta
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+from db import SNAPSHOT_DIR, ConnectionPool, get_pool
+from filters import SalesFilter
+from warehouse import SNAPSHOT_DIMENSIONS, load_snapshot_frame
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except Exception:
+    pa = None
+
+SNAPSHOT_SYNC = os.environ.get("SALESMONITOR_SNAPSHOT_SYNC", "0") == "1"
+SNAPSHOT_START = os.environ.get("SALESMONITOR_SNAPSHOT_START", "")  # first day of a new brand's store (ISO)
+
+
+def _schema():
+    return pa.schema([(c, pa.string()) for c in SNAPSHOT_DIMENSIONS] + [("qty", pa.int64()), ("sales_amt", pa.int64())])
+
+
+def day_dir(root: str, brand: str, day: date) -> str:
+    return os.path.join(root, f"brand={brand}", f"month={day:%Y-%m}", f"sale_date={day.isoformat()}")
+
+
+def write_day(root: str, brand: str, day: date, df: pd.DataFrame) -> None:
+    """Replace one day's file with `df` (SNAPSHOT_DIMENSIONS + qty, sales_amt; partition columns dropped)."""
+    frame = pd.DataFrame({c: df[c].astype("string") for c in SNAPSHOT_DIMENSIONS})
+    for m in ("qty", "sales_amt"):
+        frame[m] = pd.to_numeric(df[m]).fillna(0).astype("int64")
+    table = pa.Table.from_pandas(frame, schema=_schema(), preserve_index=False)
+    path = day_dir(root, brand, day)
+    os.makedirs(path, exist_ok=True)
+    tmp = os.path.join(path, ".part.arrow.tmp")  # dot-prefixed: skipped by dataset discovery
+    with pa.OSFile(tmp, "wb") as sink, pa_ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, os.path.join(path, "part.arrow"))
+
+
+def _manifest_path(root: str, brand: str) -> str:
+    return os.path.join(root, f"brand={brand}", "_manifest.json")
+
+
+def read_through(root: str, brand: str) -> Optional[date]:
+    """Last complete day stored for `brand`, or None for a brand without snapshots."""
+    try:
+        with open(_manifest_path(root, brand), encoding="utf-8") as f:
+            return date.fromisoformat(json.load(f)["through"])
+    except Exception:
+        return None
+
+
+def _write_through(root: str, brand: str, through: date) -> None:
+    path = _manifest_path(root, brand)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"through": through.isoformat()}, f)
+    os.replace(tmp, path)
+
+
+def snapshot_days(pool: ConnectionPool, root: str, brand: str, start: date, end: date) -> int:
+    """Query [start, end] once and write one file per day (empty days too); returns the days written."""
+    df = load_snapshot_frame(pool, SalesFilter(brand, start, end))
+    days = pd.to_datetime(df["sale_date"]).dt.date
+    by_day = dict(iter(df.groupby(days)))
+    n = (end - start).days + 1
+    for i in range(n):
+        day = start + timedelta(days=i)
+        write_day(root, brand, day, by_day.get(day, df.iloc[:0]))
+    return n
+
+
+def default_start(today: date) -> date:
+    """First day a brand without snapshots starts from: SALESMONITOR_SNAPSHOT_START, else the previous month."""
+    if SNAPSHOT_START:
+        return date.fromisoformat(SNAPSHOT_START)
+    return (today.replace(day=1) - timedelta(days=1)).replace(day=1)
+
+
+def sync_snapshots(brands: Iterable[str], root: str = SNAPSHOT_DIR, today: Optional[date] = None) -> Dict[str, Optional[str]]:
+    """
+    Bring every brand's snapshots up to today from the live warehouse; brand -> error_message (None = ok).
+    Empty when there is nothing to copy from (no warehouse, offline mode, or pyarrow missing).
+    """
+    pool = get_pool()
+    if pa is None or pool is None or pool.backend.name == "snapshot":
+        return {}
+    today = today or date.today()
+    out: Dict[str, Optional[str]] = {}
+    for brand in brands:
+        through = read_through(root, brand)
+        start = min(today, through + timedelta(days=1)) if through else default_start(today)
+        try:
+            snapshot_days(pool, root, brand, start, today)
+            _write_through(root, brand, today - timedelta(days=1))
+            out[brand] = None
+        except Exception as e:
+            out[brand] = str(e)
+    return out
+
+
+if __name__ == "__main__":
+    from warmup import read_brands
+
+    for b, err in sync_snapshots(read_brands()).items():
+        print(f"{b}: {err or 'ok'}")
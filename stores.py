@@ -0,0 +1,138 @@
+# stores.py
+# Offline store ranking (오프라인 매장 실적 TOP 15) with paging.
+# Notes:
+# - Per SalesFilter the per-store totals are loaded once: a warehouse GROUP BY store_name, or the simulated
+#   store x day series of the filter's product partitions summed over the period and scaled to the simulated
+#   cube's sub-channel totals (so the ranking agrees with the channel table above it). A failed warehouse read
+#   gives an empty ranking plus the error, never simulated stores.
+# - Rankings are partial: a partition finds the k-th largest value and only values at or above it are sorted
+#   (so ties at the cut still go by name). Deeper pages grow the sorted prefix geometrically, so paging costs
+#   O(n) once per (scope, metric) and a slice per page after that.
+
+from __future__ import annotations
+
+import threading
+import zlib
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from cube import simulated_scope_totals
+from filters import SalesFilter
+from sample_data import allocate_units, simulate_partition_daily, simulate_store_daily, split_amount
+from warehouse import OFF_CHANNEL, load_store_totals
+
+PAGE_SIZE = 15
+
+
+class Ranking:
+    """Descending order of `values` (ties by name), materialized only as deep as it has been read."""
+
+    def __init__(self, names: np.ndarray, values: np.ndarray):
+        self.names = names
+        self.values = values
+        self._order = np.empty(0, dtype=np.int64)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def top(self, k: int) -> np.ndarray:
+        """Positions of the k largest values, largest first."""
+        n = len(self.values)
+        k = min(k, n)
+        with self._lock:
+            if k > len(self._order):
+                depth = min(n, max(k, 2 * len(self._order)))
+                if depth == n:
+                    idx = np.arange(n)
+                else:
+                    # every value tied with the depth-th largest is a candidate, so names break ties at the cut
+                    cut = -np.partition(-self.values, depth - 1)[depth - 1]
+                    idx = np.flatnonzero(self.values >= cut)
+                self._order = idx[np.lexsort((self.names[idx], -self.values[idx]))][:depth]
+            return self._order[:k]
+
+    def page(self, page: int, size: int = PAGE_SIZE) -> np.ndarray:
+        return self.top((page + 1) * size)[page * size:]
+
+
+class StoreTotals:
+    def __init__(self, df: pd.DataFrame):
+        """df: [sub_channel, store_name, qty, sales], one row per store."""
+        self.sub_channel = df["sub_channel"].astype(str).to_numpy()
+        self.store = df["store_name"].astype(str).to_numpy()
+        self.qty = pd.to_numeric(df["qty"]).fillna(0).to_numpy(dtype=np.int64)
+        self.sales = pd.to_numeric(df["sales"]).fillna(0).to_numpy(dtype=np.int64)
+        self._rankings: Dict[Tuple[Optional[str], str], Tuple[np.ndarray, Ranking]] = {}
+        self._lock = threading.Lock()
+
+    def ranking(self, sub_channel: Optional[str] = None, metric: str = "sales") -> Tuple[np.ndarray, Ranking]:
+        """(row positions in scope, Ranking over them); sub_channel None = every offline store."""
+        key = (sub_channel, metric)
+        hit = self._rankings.get(key)
+        if hit is not None:
+            return hit
+        rows = np.arange(len(self.store)) if sub_channel is None else np.flatnonzero(self.sub_channel == sub_channel)
+        values = (self.sales if metric == "sales" else self.qty)[rows]
+        out = (rows, Ranking(self.store[rows], values))
+        with self._lock:
+            self._rankings[key] = out
+        return out
+
+    def page(self, sub_channel: Optional[str], page: int, size: int = PAGE_SIZE, metric: str = "sales") -> pd.DataFrame:
+        """One page of the ranking as [순위, 매장명, 매출액, 수량]."""
+        rows, ranking = self.ranking(sub_channel, metric)
+        pos = rows[ranking.page(page, size)]
+        start = page * size
+        return pd.DataFrame(
+            {"순위": np.arange(start + 1, start + len(pos) + 1), "매장명": self.store[pos], "매출액": self.sales[pos], "수량": self.qty[pos]}
+        )
+
+    def count(self, sub_channel: Optional[str] = None) -> int:
+        return len(self.ranking(sub_channel)[0])
+
+
+def simulated_store_totals(flt: SalesFilter) -> pd.DataFrame:
+    """
+    Per-store totals for the period, scaled to the simulated cube's offline sub-channel totals: the cube's
+    units are dealt over the stores by their simulated period volume, so the ranking sums to the channel table.
+    """
+    parts = []
+    partitions = flt.partitions()
+    for year in range(flt.start.year, flt.end.year + 1):
+        daily = simulate_partition_daily(flt.brand, year, partitions)
+        for sub, frame in simulate_store_daily(flt.brand, year, daily).items():
+            sums = frame.loc[pd.Timestamp(flt.start): pd.Timestamp(flt.end)].sum()
+            parts.append(pd.DataFrame({"sub_channel": sub, "store_name": sums["qty"].index, "qty": sums["qty"].to_numpy(), "sales": sums["sales"].to_numpy()}))
+    df = pd.concat(parts, ignore_index=True)
+    df = df.groupby(["sub_channel", "store_name"], as_index=False, sort=False)[["qty", "sales"]].sum()
+
+    totals = simulated_scope_totals(flt)
+    offline = totals.loc[OFF_CHANNEL] if OFF_CHANNEL in totals.index.get_level_values("channel") else totals.iloc[:0]
+    rng = np.random.default_rng(zlib.crc32(repr(flt).encode("utf-8")))
+    for sub, rows in df.groupby("sub_channel", sort=False).groups.items():
+        qty, sales = (int(offline.at[sub, "qty"]), int(offline.at[sub, "sales"])) if sub in offline.index else (0, 0)
+        units = allocate_units(qty, df.loc[rows, "qty"].to_numpy(), rng)
+        price = df.loc[rows, "sales"].to_numpy() / np.maximum(df.loc[rows, "qty"].to_numpy(), 1)
+        df.loc[rows, "qty"] = units
+        df.loc[rows, "sales"] = split_amount(sales, units * np.where(price > 0, price, 1.0))
+    return df
+
+
+@st.cache_resource(ttl=600, max_entries=64)
+def load_stores(flt: SalesFilter, gen: int = 0) -> Tuple[StoreTotals, Optional[str]]:
+    """
+    Returns (store totals, error_message) for one selection, shared by every session.
+    - gen: cache generation of the selection (cube.selection_gen); only part of the cache key
+    - simulated stores only when no warehouse is configured; a failed read gives no stores and the error
+    """
+    df, err = load_store_totals(flt)
+    if err is not None:
+        df = pd.DataFrame(columns=["sub_channel", "store_name", "qty", "sales"])
+    elif df is None:
+        df = simulated_store_totals(flt)
+    return StoreTotals(df), err
+
@@ -0,0 +1,114 @@
+# swr.py
+# Stale-while-revalidate cache: bounded in-memory LRU in front of a SQLite file.
+# Notes:
+# - get(): fresh hit -> value; stale hit -> value immediately + background refresh; miss -> load inline.
+# - Values must be JSON-serializable; they are written through to disk, so a restart (deploy) starts warm.
+# - Loaders signal failure by raising; a failed refresh keeps serving the last good value.
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+
+@dataclass(frozen=True)
+class Entry:
+    value: Any
+    fetched_at: float  # epoch seconds
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class SWRCache:
+    def __init__(self, path: str, ttl: float = 300.0, max_items: int = 512, workers: int = 2):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._mem: "OrderedDict[str, Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: Dict[str, Future] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="swr-refresh")
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db_lock = threading.Lock()
+        with self._db_lock:
+            self._db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT NOT NULL, fetched_at REAL NOT NULL)")
+            self._db.commit()
+
+    # ---- tiers
+    def peek(self, key: str) -> Optional[Entry]:
+        """Current entry (memory, then disk) without triggering any load."""
+        with self._lock:
+            e = self._mem.get(key)
+            if e is not None:
+                self._mem.move_to_end(key)
+                return e
+        with self._db_lock:
+            row = self._db.execute("SELECT value, fetched_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        e = Entry(json.loads(row[0]), float(row[1]))
+        self._remember(key, e)
+        return e
+
+    def put(self, key: str, value: Any) -> Entry:
+        e = Entry(value, time.time())
+        self._remember(key, e)
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, fetched_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), e.fetched_at),
+            )
+            self._db.commit()
+        return e
+
+    def _remember(self, key: str, e: Entry) -> None:
+        with self._lock:
+            self._mem[key] = e
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_items:
+                self._mem.popitem(last=False)
+
+    # ---- read path
+    def get(self, key: str, loader: Callable[[], Any]) -> Entry:
+        e = self.peek(key)
+        if e is None:
+            return self.put(key, loader())
+        if e.age() > self.ttl:
+            self.refresh(key, loader)
+        return e
+
+    def is_stale(self, e: Entry) -> bool:
+        return e.age() > self.ttl
+
+    def pending(self, key: str) -> Optional[Future]:
+        """The in-flight refresh of `key`, if any."""
+        with self._lock:
+            return self._refreshing.get(key)
+
+    def refresh(self, key: str, loader: Callable[[], Any]) -> Future:
+        """Reload `key` in the background (at most one refresh per key at a time)."""
+        with self._lock:
+            fut = self._refreshing.get(key)
+            if fut is not None:
+                return fut
+            fut = self._executor.submit(self._reload, key, loader)
+            self._refreshing[key] = fut
+        return fut
+
+    def _reload(self, key: str, loader: Callable[[], Any]) -> Optional[Entry]:
+        try:
+            return self.put(key, loader())
+        except Exception:
+            return None  # keep serving the previous value
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
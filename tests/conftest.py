@@ -0,0 +1,89 @@
+# tests/conftest.py
+# Shared fixtures: a small random fact table behind db.SQLiteBackend, the same stand-in the app runs on
+# with SALESMONITOR_DB=sqlite:///...
+# Notes:
+# - Loaders are exercised through their *_frame(pool, flt) functions, so no process-wide pool is configured.
+# - duck_fact_pool holds the same facts in DuckDB, for SQL that differs per dialect.
+# - Run from the repo root: python -m pytest -q
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import FACT_TABLE, ConnectionPool, DuckDBBackend, SQLiteBackend  # noqa: E402
+from warehouse import OFF_CHANNEL, ON_CHANNEL  # noqa: E402
+
+FACT_START = date(2025, 11, 1)
+FACT_DAYS = 150
+BRAND = "B"
+SUB_CHANNELS = {ON_CHANNEL: ("자사몰", "무신사"), OFF_CHANNEL: ("직영점", "백화점")}
+
+
+def make_facts(rows: int = 6000, members: int = 500, seed: int = 7) -> pd.DataFrame:
+    """Random fact rows for BRAND (plus a second brand that must never leak in); some rows have no member."""
+    rng = np.random.default_rng(seed)
+    channel = np.where(rng.random(rows) < 0.5, ON_CHANNEL, OFF_CHANNEL)
+    pick = rng.integers(0, 2, rows)
+    sub = np.array([SUB_CHANNELS[c][i] for c, i in zip(channel, pick)])
+    store = np.where(channel == OFF_CHANNEL, np.char.add("store-", rng.integers(0, 40, rows).astype(str)), None)
+    member = pd.array(rng.integers(1, members + 1, rows), dtype="Int64")
+    member[rng.random(rows) < 0.1] = pd.NA
+    days = rng.integers(0, FACT_DAYS, rows)
+    return pd.DataFrame(
+        {
+            "brand": np.where(rng.random(rows) < 0.9, BRAND, "Z"),
+            "sale_date": [(FACT_START + timedelta(days=int(d))).isoformat() for d in days],
+            "category": rng.choice(["shoes", "bags"], rows),
+            "stylecode": rng.choice(["SC-001", "SC-002", "SC-003"], rows),
+            "channel": channel,
+            "sub_channel": sub,
+            "store_name": store,
+            "member_id": member,
+            "qty": rng.integers(1, 4, rows),
+            "sales_amt": rng.integers(1, 50, rows) * 1000,
+            "color": rng.choice(["BLACK", "WHITE", "GREY"], rows),
+            "size": rng.choice(["240", "250", "260"], rows),
+            "region": np.where(channel == OFF_CHANNEL, rng.choice(["서울", "부산", "대구"], rows), None),
+            "gender": rng.choice(["male", "female"], rows),
+            "age_band": rng.choice(["20대", "30대", "40대"], rows),
+            "member_type": rng.choice(["기존회원", "신규회원"], rows),
+        }
+    )
+
+
+@pytest.fixture
+def facts() -> pd.DataFrame:
+    return make_facts()
+
+
+@pytest.fixture
+def fact_pool(tmp_path, facts):
+    path = str(tmp_path / "facts.db")
+    with sqlite3.connect(path) as conn:
+        facts.to_sql(FACT_TABLE, conn, index=False)
+    pool = ConnectionPool(SQLiteBackend(path))
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def duck_fact_pool(tmp_path, facts):
+    """The same facts behind db.DuckDBBackend (the GROUPING SETS dialect)."""
+    duckdb = pytest.importorskip("duckdb")
+    path = str(tmp_path / "facts.duckdb")
+    conn = duckdb.connect(path)
+    conn.register("facts_df", facts)
+    conn.execute(f"CREATE TABLE {FACT_TABLE} AS SELECT * FROM facts_df")
+    conn.close()
+    pool = ConnectionPool(DuckDBBackend(path))
+    yield pool
+    pool.close()
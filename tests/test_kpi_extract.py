@@ -0,0 +1,68 @@
+# tests/test_kpi_extract.py
+# KPI JSON extraction from HTML-wrapped API pages, whole and streamed in chunks.
+
+from __future__ import annotations
+
+import json
+
+from kpi import MAX_RESPONSE_BYTES, _read_until_object, extract_json_object
+
+PAYLOAD = {"brand": "X", "month": "2026-10", "sales_amt": 1234567890, "generated_at": "2026-10-17 09:00:00"}
+
+
+class StreamedPage:
+    """Stands in for a streamed requests.Response: yields the given chunks and counts what was read."""
+
+    encoding = "utf-8"
+
+    def __init__(self, chunks):
+        self.chunks = [c.encode("utf-8") if isinstance(c, str) else c for c in chunks]
+        self.read = 0
+
+    def iter_content(self, chunk_size=None):
+        for c in self.chunks:
+            self.read += 1
+            yield c
+
+
+def test_object_inside_html():
+    page = f"<html><style>.a {{ margin: 0; }}</style><script>var x = {{a: 1}};</script>{json.dumps(PAYLOAD)}</html>"
+    assert extract_json_object(page) == PAYLOAD
+
+
+def test_braces_inside_strings():
+    payload = {"note": "}{ not } a { brace", "sales_amt": 5, "label": "{\"sales_amt\": 1}"}
+    page = '<script>var s = "{ nope }";</script>' + json.dumps(payload) + "<div>}</div>"
+    assert extract_json_object(page) == payload
+
+
+def test_nested_object_holding_the_key():
+    page = "<pre>" + json.dumps({"data": {"sales_amt": 7, "generated_at": "t"}, "meta": {"n": 1}}) + "</pre>"
+    assert extract_json_object(page) == {"sales_amt": 7, "generated_at": "t"}
+
+
+def test_missing_anchor():
+    assert extract_json_object("<html>{\"revenue\": 1}</html>") is None
+    assert extract_json_object("") is None
+    assert extract_json_object('"sales_amt": 3 but no object') is None
+
+
+def test_anchor_split_across_chunks():
+    body = "<html>" + json.dumps(PAYLOAD) + "</html>"
+    cut = body.index('"sales_amt"') + 4
+    page = StreamedPage([body[:cut], body[cut:]])
+    assert _read_until_object(page) == PAYLOAD
+
+
+def test_stops_reading_once_the_object_is_complete():
+    page = StreamedPage(["<html>", json.dumps(PAYLOAD), "<div>" * 100, "</html>"])
+    assert _read_until_object(page) == PAYLOAD
+    assert page.read == 2
+
+
+def test_response_cap():
+    noise = "x" * (64 * 1024)
+    chunks = [noise] * (MAX_RESPONSE_BYTES // len(noise) + 4) + [json.dumps(PAYLOAD)]
+    page = StreamedPage(chunks)
+    assert _read_until_object(page) is None
+    assert page.read == MAX_RESPONSE_BYTES // len(noise)  # stopped at the cap, the payload was never read
@@ -0,0 +1,79 @@
+# tests/test_members.py
+# MemberIndex against first purchases computed straight from the SQLite stand-in.
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from conftest import BRAND, FACT_DAYS, FACT_START
+from filters import SalesFilter
+from members import MEMBER_TYPES, MemberIndex, MemberSplit, day_number, to_days
+from warehouse import OFF_CHANNEL, load_first_purchase_frame, load_member_order_frame
+
+LAST_DAY = FACT_START + timedelta(days=FACT_DAYS - 1)
+
+
+def history(pool):
+    def load(s: date, e: date):
+        df = load_first_purchase_frame(pool, SalesFilter(BRAND, s, e))
+        return (pd.to_numeric(df["member_id"]).to_numpy(dtype=np.int64), to_days(df["first_date"])), None
+
+    return load
+
+
+def first_purchases(facts: pd.DataFrame, through: date) -> pd.Series:
+    """member_id -> first purchase day number, brute force over the raw rows."""
+    rows = facts[(facts["brand"] == BRAND) & facts["member_id"].notna() & (facts["sale_date"] <= through.isoformat())]
+    return rows.groupby("member_id")["sale_date"].min().map(lambda d: day_number(date.fromisoformat(d)))
+
+
+def test_incremental_catch_up_equals_full_build(tmp_path, fact_pool, facts):
+    load = history(fact_pool)
+    full = MemberIndex(str(tmp_path / "full"))
+    assert full.catch_up(LAST_DAY, load) is None
+
+    inc = MemberIndex(str(tmp_path / "inc"))
+    for through in (FACT_START, FACT_START + timedelta(days=20), FACT_START + timedelta(days=21), LAST_DAY):
+        assert inc.catch_up(through, load) is None
+    inc.catch_up(FACT_START + timedelta(days=3), load)  # behind the index: nothing to do
+
+    reopened = MemberIndex(str(tmp_path / "inc"))
+    truth = first_purchases(facts, LAST_DAY)
+    for index in (full, inc, reopened):
+        assert index.through == LAST_DAY
+        np.testing.assert_array_equal(index.ids, truth.index.to_numpy(dtype=np.int64))
+        np.testing.assert_array_equal(index.first, truth.to_numpy(dtype=np.int32))
+
+
+def test_is_new_matches_first_purchase(tmp_path, fact_pool, facts):
+    through = FACT_START + timedelta(days=90)
+    index = MemberIndex(str(tmp_path / "idx"))
+    index.catch_up(through, history(fact_pool))
+    truth = first_purchases(facts, through)
+
+    ids = np.arange(0, 700, dtype=np.int64)  # ids 0 and > 500 never bought; some others bought only later
+    for start in (FACT_START, FACT_START + timedelta(days=45), through, through + timedelta(days=10)):
+        first = truth.reindex(ids).fillna(np.iinfo(np.int64).max).to_numpy()
+        np.testing.assert_array_equal(index.is_new(ids, start), first >= day_number(start))
+
+
+def test_split_matches_sql_totals(tmp_path, fact_pool, facts):
+    flt = SalesFilter.of(BRAND, FACT_START + timedelta(days=60), FACT_START + timedelta(days=89))
+    index = MemberIndex(str(tmp_path / "idx"))
+    index.catch_up(flt.end, history(fact_pool))
+    orders = load_member_order_frame(fact_pool, flt)
+    split = MemberSplit(orders, index.is_new(pd.to_numeric(orders["member_id"]).to_numpy(dtype=np.int64), flt.start))
+
+    period = facts[(facts["brand"] == BRAND) & facts["member_id"].notna()]
+    period = period[(period["sale_date"] >= flt.start.isoformat()) & (period["sale_date"] <= flt.end.isoformat())]
+    first = first_purchases(facts, flt.end)
+    new = period["member_id"].map(first) >= day_number(flt.start)
+    for channel in (None, OFF_CHANNEL):
+        scope = period["channel"] == channel if channel else pd.Series(True, index=period.index)
+        table = split.table(channel)
+        assert table.loc[MEMBER_TYPES[1], "sales"] == period.loc[scope & new, "sales_amt"].sum()
+        assert table.loc[MEMBER_TYPES[0], "sales"] == period.loc[scope & ~new, "sales_amt"].sum()
+        assert table["qty"].sum() == period.loc[scope, "qty"].sum()
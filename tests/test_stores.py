@@ -0,0 +1,56 @@
+# tests/test_stores.py
+# Partial rankings against a full sort, and store pages against the SQLite stand-in.
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import BRAND, FACT_START
+from filters import SalesFilter
+from stores import Ranking, StoreTotals
+from warehouse import OFF_CHANNEL, load_store_frame
+
+
+def full_order(names: np.ndarray, values: np.ndarray) -> np.ndarray:
+    return np.lexsort((names, -values))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_top_matches_full_sort_as_it_grows(seed):
+    rng = np.random.default_rng(seed)
+    n = 200
+    values = rng.integers(0, 6, n)  # many ties, also across every prefix cut
+    names = np.array([f"store-{i:03d}" for i in rng.permutation(n)])
+    expected = full_order(names, values)
+    ranking = Ranking(names, values)
+    for k in (1, 2, 15, 16, 40, 7, 120, 250):
+        np.testing.assert_array_equal(ranking.top(k), expected[:k])
+
+
+def test_pages_cover_the_full_order():
+    rng = np.random.default_rng(11)
+    values = rng.integers(0, 1000, 97)
+    names = np.array([f"s{i}" for i in range(97)])
+    ranking = Ranking(names, values)
+    pages = [ranking.page(p, 15) for p in range(7)]
+    np.testing.assert_array_equal(np.concatenate(pages), full_order(names, values))
+    assert len(ranking.page(7, 15)) == 0
+
+
+def test_store_pages_match_sql(fact_pool, facts):
+    flt = SalesFilter.of(BRAND, FACT_START, FACT_START + timedelta(days=59))
+    totals = StoreTotals(load_store_frame(fact_pool, flt))
+    rows = facts[(facts["brand"] == BRAND) & (facts["channel"] == OFF_CHANNEL)]
+    rows = rows[(rows["sale_date"] >= flt.start.isoformat()) & (rows["sale_date"] <= flt.end.isoformat())]
+    for sub in (None, "직영점"):
+        scoped = rows if sub is None else rows[rows["sub_channel"] == sub]
+        sums = scoped.groupby(["sub_channel", "store_name"], as_index=False)["sales_amt"].sum()
+        sums = sums.sort_values(["sales_amt", "store_name"], ascending=[False, True], kind="stable")
+        got = pd.concat([totals.page(sub, p) for p in range(-(-len(sums) // 15))], ignore_index=True)
+        assert got["매출액"].tolist() == sums["sales_amt"].tolist()
+        assert got["순위"].tolist() == list(range(1, len(sums) + 1))
+        assert totals.count(sub) == len(sums)
@@ -0,0 +1,59 @@
+# tests/test_warehouse.py
+# PageQueryPlan on both dialects: the UNION ALL branches (SQLite) and GROUPING SETS (DuckDB) split back into
+# the same frames as a pandas groupby of the raw facts.
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import BRAND, FACT_START
+from filters import SalesFilter
+from warehouse import PAGE_GROUPINGS, PageQueryPlan, load_page_frames
+
+
+def test_grouping_id_bit_layout():
+    plan = PageQueryPlan(PAGE_GROUPINGS)
+    n = len(plan.columns)
+    ids = [plan.grouping_id(g) for g in plan.groupings]
+    assert len(set(ids)) == len(ids)
+    for g, gid in zip(plan.groupings, ids):
+        # like GROUPING(c1, ..., cn): the first column is the highest bit, set when the column is rolled up
+        assert [bool(gid >> (n - 1 - i) & 1) for i in range(n)] == [c not in g for c in plan.columns]
+    assert plan.grouping_id(tuple(plan.columns)) == 0
+    assert plan.grouping_id(()) == (1 << n) - 1
+
+
+def test_unknown_dimension_is_rejected():
+    with pytest.raises(ValueError):
+        PageQueryPlan([("channel", "stylecode")])
+
+
+def _canonical(df: pd.DataFrame, dims) -> pd.DataFrame:
+    out = df.copy()
+    for d in dims:
+        out[d] = out[d].astype(object).where(out[d].notna(), "<null>").astype(str)
+    for m in ("qty", "sales"):
+        out[m] = pd.to_numeric(out[m]).astype(np.int64)
+    return out.sort_values(list(dims)).reset_index(drop=True) if dims else out.reset_index(drop=True)
+
+
+@pytest.mark.parametrize("pool_fixture", ["fact_pool", "duck_fact_pool"])
+def test_split_matches_pandas_groupby(request, pool_fixture, facts):
+    pool = request.getfixturevalue(pool_fixture)
+    flt = SalesFilter.of(BRAND, FACT_START + timedelta(days=10), FACT_START + timedelta(days=70), ["shoes"])
+    frames = load_page_frames(pool, flt)
+    assert set(frames) == set(PAGE_GROUPINGS)
+
+    rows = facts[(facts["brand"] == BRAND) & (facts["category"] == "shoes")]
+    rows = rows[(rows["sale_date"] >= flt.start.isoformat()) & (rows["sale_date"] <= flt.end.isoformat())]
+    rows = rows.rename(columns={"sales_amt": "sales"})
+    for g in PAGE_GROUPINGS:
+        if g:
+            expected = rows.groupby(list(g), dropna=False)[["qty", "sales"]].sum().reset_index()
+        else:
+            expected = rows[["qty", "sales"]].sum().to_frame().T
+        pd.testing.assert_frame_equal(_canonical(frames[g], g), _canonical(expected, g), check_dtype=False)
@@ -0,0 +1,108 @@
+# trend.py
+# Trend charts over the Analysis Period: one daily series per sub-channel, weekly/monthly resampled from it.
+# Notes:
+# - Daily frame: DatetimeIndex (every day of the period) x MultiIndex columns (metric, channel, sub_channel).
+#   Source is the warehouse daily aggregate for the SalesFilter when configured, otherwise the simulated
+#   daily series of the filter's product partitions. A failed warehouse read gives an empty chart plus the
+#   error, not simulated numbers.
+# - Daily, weekly (ISO weeks, labelled by Monday) and monthly frames live in a process-wide RollupStore
+#   (rollup.py): widening the period loads only the new days, and 일/주/월 toggles are memoized slices.
+#   Days up to yesterday are stored; today is reloaded once its short TTL runs out. The store is keyed on the
+#   filter's scope and its generation (cube.scope_gen), so moving the period keeps what is already stored.
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from rollup import GRAINS, RollupStore, rollup
+from filters import SalesFilter
+from sample_data import simulate_partition_daily
+from warehouse import OFF_CHANNEL, ON_CHANNEL, load_daily
+
+METRICS = ("qty", "sales")
+VIEWS = GRAINS
+
+SERIES_LABELS = {ON_CHANNEL: "ONLINE TOTAL", OFF_CHANNEL: "OFFLINE TOTAL"}
+
+
+def daily_from_long(df: pd.DataFrame, start: date, end: date) -> pd.DataFrame:
+    """Warehouse long frame [sale_date, channel, sub_channel, qty, sales] -> daily frame over [start, end]."""
+    days = pd.date_range(start, end, freq="D")
+    if df.empty:
+        return pd.DataFrame(
+            index=days,
+            columns=pd.MultiIndex.from_tuples([], names=["metric", "channel", "sub_channel"]),
+            dtype=np.int64,
+        )
+    df = df.assign(sale_date=pd.to_datetime(df["sale_date"]))
+    for m in METRICS:
+        df[m] = pd.to_numeric(df[m]).fillna(0).astype(np.int64)
+    wide = df.groupby(["sale_date", "channel", "sub_channel"])[list(METRICS)].sum().unstack(["channel", "sub_channel"], fill_value=0)
+    wide.columns = wide.columns.set_names(["metric", "channel", "sub_channel"])
+    return wide.reindex(days, fill_value=0)
+
+
+def simulated_daily(flt: SalesFilter) -> pd.DataFrame:
+    """Simulated daily frame over the filter's period, from its matching product partitions only."""
+    partitions = flt.partitions()
+    years = [simulate_partition_daily(flt.brand, y, partitions) for y in range(flt.start.year, flt.end.year + 1)]
+    return pd.concat(years).loc[pd.Timestamp(flt.start): pd.Timestamp(flt.end)]
+
+
+@st.cache_resource
+def get_rollup_store() -> RollupStore:
+    return RollupStore()
+
+
+def load_trend(flt: SalesFilter, view: str = "daily", gen: int = 0) -> Tuple[pd.DataFrame, Optional[str]]:
+    """
+    Returns (frame at `view` granularity over the filter's period, error_message).
+    - gen: cache generation of the filter's scope (cube.scope_gen); a new one drops the stored rollups
+    - simulated days only when no warehouse is configured; on a warehouse (and snapshot) error the frame is
+      empty and the error is returned, never simulated numbers
+    """
+    errors: List[str] = []
+
+    def load(s: date, e: date) -> Optional[pd.DataFrame]:
+        df, err = load_daily(flt.between(s, e))
+        if err:
+            errors.append(err)
+            return None
+        return daily_from_long(df, s, e) if df is not None else simulated_daily(flt.between(s, e))
+
+    closed = date.today() - timedelta(days=1)
+    frame = get_rollup_store().view(flt.scope, gen, flt.start, flt.end, view, load, closed=closed)
+    if frame is None:
+        return rollup(daily_from_long(pd.DataFrame(), flt.start, flt.end), view), errors[0]
+    return frame, None
+
+
+def trend_frame(frame: pd.DataFrame, metric: str, mode: str, selected: str) -> pd.DataFrame:
+    """
+    Series to chart, like index.html renderSingleChart(), as a wide frame ready for st.line_chart.
+    - mode: main (channel totals) / on / off (sub-channels)
+    - selected: the selection of that section's table ("전체", "온라인 전체", "무신사", ...)
+    Returns DF indexed by x (bucket start), one column per series, built with one matrix product.
+    """
+    if metric not in frame.columns.get_level_values("metric"):
+        return pd.DataFrame(index=frame.index.rename("x"))
+    m = frame[metric]
+    channels = np.asarray(m.columns.get_level_values("channel"))
+    subs = np.asarray(m.columns.get_level_values("sub_channel"))
+
+    if mode == "main":
+        channel = selected or "전체"
+        names = [SERIES_LABELS[ch] for ch in (ON_CHANNEL, OFF_CHANNEL) if channel in ("전체", ch)]
+        masks = [channels == ch for ch in (ON_CHANNEL, OFF_CHANNEL) if channel in ("전체", ch)]
+    else:
+        ch = ON_CHANNEL if mode == "on" else OFF_CHANNEL
+        names = list(dict.fromkeys(subs[channels == ch])) if "전체" in (selected or "") else [selected]
+        masks = [subs == s for s in names]
+
+    pick = np.column_stack(masks).astype(np.int64) if masks else np.zeros((len(subs), 0), dtype=np.int64)
+    return pd.DataFrame(m.to_numpy() @ pick, index=m.index.rename("x"), columns=names)
@@ -0,0 +1,231 @@
+# warehouse.py
+# Dashboard data from the sales fact table (Snowflake, or a SQLite/DuckDB stand-in via db.py).
+# Notes:
+# - Expected fact table (name via SALESMONITOR_FACT_TABLE, default sales_fact), one row per order line:
+#     brand, sale_date, category, stylecode, channel ('온라인'/'오프라인'), sub_channel, store_name,
+#     color, size, region, gender ('male'/'female'), age_band, member_type ('기존회원'/'신규회원'), member_id (integer),
+#     qty, sales_amt
+# - Every loader takes a SalesFilter (filters.py) and pushes it down as the WHERE clause: brand and the
+#   sale_date range (the table's partition/cluster key) plus category/stylecode IN lists.
+# - The per-grouping frames become the materialized cuboids of a SalesCube (cube.py).
+# - Trend charts read a separate daily (sale_date, channel, sub_channel) aggregate (trend.py), and the
+#   store ranking a per-store aggregate of the offline channel (stores.py).
+# - The 기존/신규 split reads per-member first purchase dates and per-member period totals (members.py).
+# - Brands without a catalog file get their style codes from the fact table (catalog.py).
+# - A failed read is retried once on the local snapshot store (db.get_snapshot_pool), so panels keep working
+#   through warehouse outages.
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from db import FACT_TABLE, ConnectionPool, get_pool, get_snapshot_pool
+from filters import SalesFilter
+
+ON_CHANNEL = "온라인"
+OFF_CHANNEL = "오프라인"
+
+DIMENSIONS = ("channel", "sub_channel", "color", "size", "region", "gender", "age_band", "member_type")
+
+# Columns of the daily snapshot aggregate (snapshot.py); member_id is left out, so snapshot-backed reads
+# have no 기존/신규 index and the panel uses member_type.
+SNAPSHOT_DIMENSIONS = ("category", "stylecode", "store_name") + DIMENSIONS
+
+Grouping = Tuple[str, ...]
+
+# Every breakdown the page renders, expressed as group-by column sets (one GROUPING SETS query).
+# Scope prefix (all / channel / sub-channel) x panel suffix, plus the offline geo table.
+_SCOPES: List[Grouping] = [(), ("channel",), ("channel", "sub_channel")]
+_PANELS: List[Grouping] = [(), ("color",), ("size",), ("member_type",), ("gender", "age_band")]
+PAGE_GROUPINGS: List[Grouping] = [s + p for s in _SCOPES for p in _PANELS] + [
+    ("channel", "region"),
+    ("channel", "sub_channel", "region"),
+]
+
+
+class PageQueryPlan:
+    """
+    Collects every breakdown the page needs and fetches them in ONE statement:
+    - Snowflake/DuckDB: GROUP BY GROUPING SETS (...) with GROUPING(...) as the set id
+    - SQLite (no GROUPING SETS): UNION ALL of the same group-bys, each branch tagged with the same id
+    The flat result is then split back into one frame per grouping.
+    """
+
+    def __init__(self, groupings: List[Grouping]):
+        for g in groupings:
+            for d in g:
+                if d not in DIMENSIONS:
+                    raise ValueError(f"unknown dimension: {d}")
+        self.groupings = list(dict.fromkeys(groupings))
+        used = {d for g in self.groupings for d in g}
+        self.columns = [d for d in DIMENSIONS if d in used]
+
+    def grouping_id(self, dims: Grouping) -> int:
+        # Same bit layout as GROUPING(c1, ..., cn): bit set when the column is rolled up.
+        n = len(self.columns)
+        return sum(1 << (n - 1 - i) for i, c in enumerate(self.columns) if c not in dims)
+
+    def sql(self, dialect: str, where: str) -> Tuple[str, int]:
+        """Returns (sql, how many times the WHERE params must be repeated)."""
+        cols = ", ".join(self.columns)
+        if dialect == "sqlite":
+            branches = []
+            for g in self.groupings:
+                select = ", ".join(c if c in g else f"NULL AS {c}" for c in self.columns)
+                group = f" GROUP BY {', '.join(g)}" if g else ""
+                branches.append(
+                    f"SELECT {select}, {self.grouping_id(g)} AS grouping_id, SUM(qty) AS qty, SUM(sales_amt) AS sales"
+                    f" FROM {FACT_TABLE} WHERE {where}{group}"
+                )
+            return " UNION ALL ".join(branches), len(branches)
+
+        sets = ", ".join(f"({', '.join(g)})" for g in self.groupings)
+        return (
+            f"SELECT {cols}, GROUPING({cols}) AS grouping_id, SUM(qty) AS qty, SUM(sales_amt) AS sales"
+            f" FROM {FACT_TABLE} WHERE {where} GROUP BY GROUPING SETS ({sets})"
+        ), 1
+
+    def split(self, df: pd.DataFrame) -> Dict[Grouping, pd.DataFrame]:
+        ids = df["grouping_id"].astype("int64")
+        out: Dict[Grouping, pd.DataFrame] = {}
+        for g in self.groupings:
+            part = df.loc[ids == self.grouping_id(g), list(g) + ["qty", "sales"]]
+            out[g] = part.reset_index(drop=True)
+        return out
+
+
+def _load(frame_fn: Callable[..., Any], *args: Any) -> Tuple[Any, Optional[str]]:
+    """
+    The contract of every load_* wrapper below: (frame_fn(pool, *args), None) on success, where pool is the
+    configured warehouse or, when that read fails, the local snapshots.
+    - (None, None): no warehouse is configured; callers fall back to simulated data
+    - (None, error_message): the warehouse and the snapshots both failed; callers show the error
+    """
+    pool = get_pool()
+    if pool is None:
+        return None, None
+    try:
+        return frame_fn(pool, *args), None
+    except Exception as e:
+        err = str(e)
+    fallback = get_snapshot_pool()
+    if fallback is None or pool.backend.name == "snapshot":
+        return None, err
+    try:
+        return frame_fn(fallback, *args), None
+    except Exception:
+        return None, err
+
+
+def load_page_frames(
+    pool: ConnectionPool,
+    flt: SalesFilter,
+) -> Dict[Grouping, pd.DataFrame]:
+    plan = PageQueryPlan(PAGE_GROUPINGS)
+    where, params = flt.where()
+    sql, repeat = plan.sql(pool.dialect, where)
+    return plan.split(pool.query_df(sql, params * repeat))
+
+
+def load_page_cuboids(flt: SalesFilter) -> Tuple[Optional[Dict[Grouping, pd.DataFrame]], Optional[str]]:
+    """(frames per grouping, error_message); see _load."""
+    return _load(load_page_frames, flt)
+
+
+def load_daily_frame(
+    pool: ConnectionPool,
+    flt: SalesFilter,
+) -> pd.DataFrame:
+    """Long frame [sale_date, channel, sub_channel, qty, sales], one row per day and sub-channel."""
+    where, params = flt.where()
+    sql = (
+        f"SELECT sale_date, channel, sub_channel, SUM(qty) AS qty, SUM(sales_amt) AS sales"
+        f" FROM {FACT_TABLE} WHERE {where} GROUP BY sale_date, channel, sub_channel"
+    )
+    return pool.query_df(sql, params)
+
+
+def load_daily(flt: SalesFilter) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """(daily long frame, error_message); see _load."""
+    return _load(load_daily_frame, flt)
+
+
+def load_store_frame(
+    pool: ConnectionPool,
+    flt: SalesFilter,
+) -> pd.DataFrame:
+    """Long frame [sub_channel, store_name, qty, sales], one row per offline store over the period."""
+    where, params = flt.where()
+    sql = (
+        f"SELECT sub_channel, store_name, SUM(qty) AS qty, SUM(sales_amt) AS sales"
+        f" FROM {FACT_TABLE} WHERE {where} AND channel = ? GROUP BY sub_channel, store_name"
+    )
+    return pool.query_df(sql, params + [OFF_CHANNEL])
+
+
+def load_store_totals(flt: SalesFilter) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """(per-store frame, error_message); see _load."""
+    return _load(load_store_frame, flt)
+
+
+def load_first_purchase_frame(pool: ConnectionPool, flt: SalesFilter) -> pd.DataFrame:
+    """Frame [member_id, first_date]: each member's first purchase within the filter."""
+    where, params = flt.where()
+    sql = (
+        f"SELECT member_id, MIN(sale_date) AS first_date"
+        f" FROM {FACT_TABLE} WHERE {where} AND member_id IS NOT NULL GROUP BY member_id"
+    )
+    return pool.query_df(sql, params)
+
+
+def load_first_purchases(flt: SalesFilter) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """(first purchase frame, error_message); see _load."""
+    return _load(load_first_purchase_frame, flt)
+
+
+def load_member_order_frame(
+    pool: ConnectionPool,
+    flt: SalesFilter,
+) -> pd.DataFrame:
+    """Long frame [member_id, channel, sub_channel, qty, sales], one row per member and sub-channel."""
+    where, params = flt.where()
+    sql = (
+        f"SELECT member_id, channel, sub_channel, SUM(qty) AS qty, SUM(sales_amt) AS sales"
+        f" FROM {FACT_TABLE} WHERE {where} AND member_id IS NOT NULL GROUP BY member_id, channel, sub_channel"
+    )
+    return pool.query_df(sql, params)
+
+
+def load_member_orders(flt: SalesFilter) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """(per-member frame, error_message); see _load."""
+    return _load(load_member_order_frame, flt)
+
+
+def load_catalog_frame(pool: ConnectionPool, brand: str) -> pd.DataFrame:
+    """Frame [stylecode, category], one row per style code the brand has sold."""
+    sql = f"SELECT DISTINCT stylecode, category FROM {FACT_TABLE} WHERE brand = ? AND stylecode IS NOT NULL"
+    return pool.query_df(sql, [brand])
+
+
+def load_catalog_codes(brand: str) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    """(style code frame, error_message); see _load."""
+    return _load(load_catalog_frame, brand)
+
+
+def load_snapshot_frame(pool: ConnectionPool, flt: SalesFilter) -> pd.DataFrame:
+    """Long frame [sale_date, *SNAPSHOT_DIMENSIONS, qty, sales_amt]: the filter's facts summed per day."""
+    where, params = flt.where()
+    cols = ", ".join(SNAPSHOT_DIMENSIONS)
+    sql = (
+        f"SELECT sale_date, {cols}, SUM(qty) AS qty, SUM(sales_amt) AS sales_amt"
+        f" FROM {FACT_TABLE} WHERE {where} GROUP BY sale_date, {cols}"
+    )
+    return pool.query_df(sql, params)
+
+
+def load_sales_total_frame(pool: ConnectionPool, flt: SalesFilter) -> pd.DataFrame:
+    """One-row frame [sales]: total sales amount of the filter."""
+    where, params = flt.where()
+    return pool.query_df(f"SELECT SUM(sales_amt) AS sales FROM {FACT_TABLE} WHERE {where}", params)
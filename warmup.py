@@ -0,0 +1,153 @@
+# warmup.py
+# Warm start: prefetch every brand's KPI and page cube for the current and previous month at process boot.
+# Notes:
+# - Streamlit has no startup hook; the first script run calls get_warmup(), which starts one background pass
+#   (st.cache_resource makes it once per process). Nobody waits on it: pages that arrive first just load lazily.
+# - Optional periodic refresher (SALESMONITOR_WARMUP_INTERVAL seconds, 0 = off) re-runs the pass with refresh
+#   semantics: KPI via the SWR cache, cubes via a new cache generation, so readers are never blocked.
+# - With SALESMONITOR_SNAPSHOT_SYNC=1 each pass first brings every brand's local snapshots up to today
+#   (snapshot.py), so the refresher doubles as the daily snapshot writer.
+# - status() feeds the "시스템 상태" expander.
+
+from __future__ import annotations
+
+import calendar
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import List, Optional, Tuple
+
+import streamlit as st
+
+from cube import current_cube, rebuild_cube
+from filters import SalesFilter
+from kpi import refresh_sales_amt, submit_many
+from snapshot import SNAPSHOT_SYNC, sync_snapshots
+
+BRANDS_PATH = "data/brands.json"
+FALLBACK_BRANDS = ["I", "M", "ST", "V", "X"]
+WARMUP_INTERVAL_SECONDS = float(os.environ.get("SALESMONITOR_WARMUP_INTERVAL", "0"))
+WARMUP_WORKERS = 4
+
+
+def read_brands() -> List[str]:
+    # HTML loads ./data/brands.json; try same path in Streamlit.
+    # Fallback to common brand list if file not present.
+    try:
+        with open(BRANDS_PATH, "r", encoding="utf-8") as f:
+            j = json.load(f)
+        brands = j.get("brands")
+        if isinstance(brands, list) and brands:
+            return [str(x) for x in brands]
+    except Exception:
+        pass
+    return list(FALLBACK_BRANDS)
+
+
+def month_range(d: date) -> Tuple[date, date]:
+    return date(d.year, d.month, 1), date(d.year, d.month, calendar.monthrange(d.year, d.month)[1])
+
+
+def previous_month(d: date) -> date:
+    return date(d.year - 1, 12, 1) if d.month == 1 else date(d.year, d.month - 1, 1)
+
+
+@dataclass(frozen=True)
+class WarmupStatus:
+    state: str = "idle"  # idle / running / done
+    passes: int = 0
+    started_at: Optional[float] = None  # epoch seconds of the latest pass
+    duration: Optional[float] = None  # seconds the latest finished pass took
+    kpis: int = 0  # pairs fetched OK in the latest pass
+    cubes: int = 0  # selections built in the latest pass
+    snapshots: int = 0  # brands whose snapshots were brought up to date in the latest pass
+    errors: int = 0
+
+
+class Warmup:
+    def __init__(self, categories: Tuple[str, ...], stylecodes: Tuple[str, ...], interval: float = 0.0):
+        self.categories = categories
+        self.stylecodes = stylecodes
+        self.interval = interval
+        self._status = WarmupStatus()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, name="warmup", daemon=True)
+
+    def start(self) -> "Warmup":
+        self._thread.start()
+        return self
+
+    def status(self) -> WarmupStatus:
+        with self._lock:
+            return self._status
+
+    def _set(self, **changes) -> None:
+        with self._lock:
+            self._status = replace(self._status, **changes)
+
+    def targets(self) -> Tuple[List[Tuple[str, str]], List[SalesFilter]]:
+        """(KPI pairs, cube selections): every brand x current and previous month, page default filters."""
+        today = date.today()
+        months = [month_range(today), month_range(previous_month(today))]
+        brands = read_brands()
+        pairs = [(b, f"{s.year}-{s.month:02d}") for b in brands for s, _ in months]
+        selections = [SalesFilter.of(b, s, e, self.categories, self.stylecodes) for b in brands for s, e in months]
+        return pairs, selections
+
+    def run_once(self, refresh: bool = False) -> WarmupStatus:
+        t0 = time.time()
+        self._set(state="running", started_at=t0)
+        pairs, selections = self.targets()
+        synced = sync_snapshots(read_brands()) if SNAPSHOT_SYNC else {}
+
+        if refresh:
+            kpi_futures = [refresh_sales_amt(b, m) for b, m in pairs]
+        else:
+            kpi_futures = [p.future for p in submit_many(pairs, float("inf")).values()]
+
+        build = rebuild_cube if refresh else current_cube
+        with ThreadPoolExecutor(max_workers=WARMUP_WORKERS, thread_name_prefix="warmup") as ex:
+            cube_results = list(ex.map(build, selections))
+
+        kpis = errors = 0
+        for fut in kpi_futures:
+            v = fut.result()
+            # first pass yields KpiValue; refreshes yield an swr Entry (None when the request failed)
+            ok = v is not None and getattr(v, "error", None) is None
+            kpis += ok
+            errors += not ok
+        errors += sum(1 for _, err in cube_results if err)
+        errors += sum(1 for err in synced.values() if err)
+
+        self._set(
+            state="done",
+            passes=self._status.passes + 1,
+            duration=time.time() - t0,
+            kpis=kpis,
+            cubes=len(cube_results),
+            snapshots=sum(1 for err in synced.values() if err is None),
+            errors=errors,
+        )
+        return self.status()
+
+    def _loop(self) -> None:
+        refresh = False
+        while True:
+            try:
+                self.run_once(refresh=refresh)
+            except Exception:
+                self._set(state="done", errors=self._status.errors + 1)
+            if self.interval <= 0:
+                return
+            refresh = True
+            time.sleep(self.interval)
+
+
+@st.cache_resource
+def get_warmup(categories: Tuple[str, ...], stylecodes: Tuple[str, ...]) -> Warmup:
+    """Starts the warm-up (and refresher, if configured) once per process."""
+    return Warmup(categories, stylecodes, WARMUP_INTERVAL_SECONDS).start()